@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -7,14 +8,20 @@ warnings.filterwarnings('ignore')
 from lifelines import KaplanMeierFitter
 import plotly.graph_objects as go
 
-from utils.data_processing import load_data, process_data
+from utils.data_processing import process_data
+from utils.upload_cache import load_data_cached
+from utils.out_of_core import source_dates, perform_kaplan_meier_analysis_out_of_core
+from utils.competing_risks import cumulative_incidence, incidence_at
+from utils.sensitivity import DEFAULT_CUTOFF_DAYS, DEFAULT_CORRECTION_FACTORS, sensitivity_grid
 from utils.modeling import (
     perform_kaplan_meier_analysis,
     create_monthly_distribution_chart,
     display_auc_metrics,
     create_survival_curve_chart,
     create_grouped_survival_curves,
-    create_auc_analysis_table
+    create_auc_analysis_table,
+    create_sensitivity_heatmap,
+    create_cumulative_incidence_charts
 )
 
 st.set_page_config(
@@ -25,15 +32,72 @@ st.set_page_config(
 
 st.subheader("1️⃣ 데이터 업로드 및 현재 생존분석")
 
-# 파일 업로드
-uploaded_file = st.file_uploader(
-    "CSV 파일을 선택하세요",
-    type=['csv']
+# 데이터 소스 선택
+source_mode = st.radio(
+    "데이터 소스",
+    ["CSV 업로드", "Parquet 파티션 (대용량)"],
+    horizontal=True,
+    help="대용량 모드는 crda 월별 Parquet 파티션을 배치 단위로 읽어 메모리 사용량을 제한합니다"
 )
 
+uploaded_file = None
+if source_mode == "CSV 업로드":
+    # 파일 업로드
+    uploaded_file = st.file_uploader(
+        "CSV 파일을 선택하세요",
+        type=['csv']
+    )
+else:
+    partition_root = st.text_input("파티션 경로", value="data/partitions")
+    memory_limit_mb = st.number_input("메모리 한도 (MB)", min_value=16, value=256, step=16)
+
+    if os.path.isdir(partition_root):
+        CURRNET_DATE, CUTOFF_DATE = source_dates(partition_root)
+        st.info(f"현재 시점 {CURRNET_DATE.strftime('%Y-%m-%d')}")
+
+        st.write("")
+        st.subheader("📅 분석 대상 기간 설정")
+        col1, col2 = st.columns(2)
+        with col1:
+            START_DATE = st.date_input(
+                "시작 날짜",
+                value=datetime(2023, 5, 1),
+                format="YYYY-MM-DD"
+            )
+        with col2:
+            END_DATE = st.date_input(
+                "종료 날짜",
+                value=datetime(2024, 4, 30),
+                format="YYYY-MM-DD"
+            )
+
+        # 파티션별 집계표 누적 후 생존 분석
+        survival_df, auc_value, summary = perform_kaplan_meier_analysis_out_of_core(
+            partition_root, START_DATE, END_DATE, CUTOFF_DATE,
+            memory_limit=memory_limit_mb * 1024 ** 2
+        )
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("📝 총 수업 수", f"{summary['total_count']:,}개")
+        with col2:
+            st.metric("❌ 중단 수업", f"{summary['finished_count']:,}개")
+        with col3:
+            st.metric("✅ 활성 수업", f"{summary['total_count'] - summary['finished_count']:,}개")
+        with col4:
+            st.metric("🔧 DM 보정", f"{summary['corrected_rows']:,}개")
+
+        display_auc_metrics(survival_df, auc_value)
+        create_survival_curve_chart(survival_df)
+    else:
+        st.warning(f"파티션 경로를 찾을 수 없습니다: {partition_root}")
+
 if uploaded_file is not None:
-    df, CURRNET_DATE, CUTOFF_DATE = load_data(uploaded_file)
+    # 같은 내용의 파일은 재파싱 없이 캐시에서 로드 (기간 필터만 다시 계산)
+    df, CURRNET_DATE, CUTOFF_DATE, cache_source = load_data_cached(uploaded_file)
     st.info(f"현재 시점 {CURRNET_DATE.strftime('%Y-%m-%d')}")
+    if cache_source is not None:
+        st.caption(f"⚡ 캐시된 파싱 결과 사용 ({'메모리' if cache_source == 'memory' else '디스크'})")
 
     # 날짜 범위 선택
     st.write("")
@@ -73,5 +137,33 @@ if uploaded_file is not None:
 
     # AUC 분석 결과 표
     create_auc_analysis_table(processed_df)
-    
+
+    # 이탈 사유별 누적발생률 (경쟁위험)
+    incidence = cumulative_incidence(processed_df)
+    create_cumulative_incidence_charts(incidence)
+    st.caption("36개월 시점 사유별 누적발생률 (%)")
+    st.dataframe(incidence_at(incidence, 36).round(1), width='stretch')
+
+    # 이탈 판정 기준 민감도 (CUTOFF 일수 × done_month 보정계수)
+    with st.expander("🧪 이탈 판정 기준 민감도 분석"):
+        col1, col2 = st.columns(2)
+        with col1:
+            cutoff_days = st.multiselect(
+                "CUTOFF 일수", [7, 14, 21, 30, 45, 60, 90, 120],
+                default=list(DEFAULT_CUTOFF_DAYS)
+            )
+        with col2:
+            correction_factors = st.multiselect(
+                "done_month 보정계수", [0.5, 0.6, 0.7, 0.8, 0.9, 1.0],
+                default=list(DEFAULT_CORRECTION_FACTORS)
+            )
+
+        if cutoff_days and correction_factors:
+            grid_df = sensitivity_grid(
+                df, START_DATE, END_DATE, CURRNET_DATE,
+                cutoff_days=sorted(cutoff_days), correction_factors=sorted(correction_factors)
+            )
+            create_sensitivity_heatmap(grid_df)
+            st.dataframe(grid_df, width='stretch')
+
     st.subheader("2️⃣ AUC 개선 목표 설정")
\ No newline at end of file
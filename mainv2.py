@@ -6,6 +6,7 @@ import warnings
 warnings.filterwarnings('ignore')
 from lifelines import KaplanMeierFitter, CoxPHFitter
 from utils.load_googlesheet import *
+from utils.shared_store import enable_copy_on_write, session_view
 from utils.visualization import (
     create_monthly_bar_chart,
     create_weekly_bar_chart,
@@ -14,23 +15,146 @@ from utils.visualization import (
     create_survival_duration_boxplot,
     create_churn_rate_timeline,
     create_survival_comparison_chart,
-    calculate_auc,
-    calculate_survival_rate_at_time,
-    display_auc_improvement_results
+    display_auc_improvement_results,
+    create_extrapolation_chart,
+    create_customer_survival_chart,
+    create_repurchase_chart,
+    create_approximate_survival_curves
 )
+from utils.survival import UNIT_DAYS, HORIZON_DAYS, PAY_MONTH_GROUPS, SurvivalCurve, fit_group_curves
+from utils.parallel import analyze_groups_parallel
+from utils.scoring import score_active_lessons
+from utils.group_tests import build_event_table, multigroup_test, pairwise_tests, format_p_value
+from utils.extrapolation import MODELS, extrapolation_table
+from utils.customers import sort_lessons_by_user, customer_lifetimes, purchase_gaps, fit_gap_curves
+from utils.progressive import approximation_error
 
 st.set_page_config(
     page_title="📊 수업 잔존기간 통합 분석 도구",
     page_icon="📊",
     layout="wide"
 )
+
+# 세션들이 공유 스냅샷을 복사 없이 뷰로 사용하도록 Copy-on-Write 활성화
+# - 프로세스 전역 설정이며 이 앱(pages/ 포함)에서는 여기서만 호출 (utils.shared_store.enable_copy_on_write 참고)
+enable_copy_on_write()
+
 st.subheader("1️⃣ 데이터 업로드 및 현재 생존분석")
 
-df = load_google_sheets_data("이탈_RAW")
 
-with st.status("구글시트 데이터 처리 중..."):
-    df_processed = processing_google_sheet(df)
-    st.success("처리가 완료되었습니다 ✅")
+@st.cache_resource(max_entries=4)
+def get_group_curves(loaded_at, _df_processed):
+    """스냅샷별 일 단위 생존곡선 (loaded_at이 같으면 재사용)"""
+    return fit_group_curves(_df_processed, groups)
+
+
+@st.cache_resource(max_entries=4)
+def get_customer_analysis(loaded_at, _df_processed):
+    """스냅샷별 고객 단위 생존 / 재구매 간격 (user_No 정렬 한 번 공유)"""
+    lessons = sort_lessons_by_user(_df_processed)
+    lifetimes = customer_lifetimes(_df_processed, lessons=lessons)
+    gaps = purchase_gaps(_df_processed, lessons=lessons)
+    customer_curve = SurvivalCurve.fit(lifetimes['생존일수'], lifetimes['이탈여부'])
+    return lifetimes, customer_curve, fit_gap_curves(gaps)
+
+
+@st.cache_data(max_entries=16)
+def get_risk_table(loaded_at, horizon_weeks, _df_processed):
+    """스냅샷 × 평가 기간별 활성 수업 위험 순위 (위젯 조작마다 재계산하지 않음)"""
+    return score_active_lessons(_df_processed, horizon_weeks=horizon_weeks)
+
+
+@st.cache_resource(max_entries=16)
+def get_segment_table(loaded_at, segment_cols, _df_processed):
+    """스냅샷 × 세그먼트 기준별 일 단위 세그먼트 요약표 (위젯 조작 / 단위 전환마다 재피팅하지 않음)"""
+    segment_df, _ = analyze_groups_parallel(
+        _df_processed,
+        list(segment_cols),
+        max_time=HORIZON_DAYS,
+        min_group_size=30
+    )
+    return segment_df.sort_values("샘플 수", ascending=False)
+
+
+# 백그라운드 갱신기: 마지막 정상 스냅샷을 바로 사용하고, 첫 적재 때만 대기
+refresher = get_sheet_refresher("이탈_RAW")
+
+if refresher.snapshot is None:
+    with st.status("구글시트 데이터 처리 중..."):
+        preview = refresher.wait_preview()
+        st.success("처리가 완료되었습니다 ✅" if preview is None else "근사 결과가 준비되었습니다 ⚡")
+
+    # 첫 적재: 층화 표본 근사 결과를 먼저 보여주고, 전체 처리가 끝나면 다시 실행해 교체
+    if preview is not None:
+        approx = preview.data
+        st.info(
+            f"⚡ 근사 결과 (결제개월수 × 결제월 층화 표본 {approx['sample_size']:,}건 / 전체 약 {approx['population_size']:,.0f}건). "
+            "전체 데이터 처리가 끝나면 정확한 결과로 자동 교체됩니다."
+        )
+        analysis_unit = st.radio("분석 단위 선택", ["주", "개월"], horizontal=True, help="생존분석과 시각화에 사용할 시간 단위를 선택하세요")
+        kpis = approx["kpis"].set_index("구분")
+        overall = kpis.loc["전체"]
+        unit_days = UNIT_DAYS[analysis_unit]
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"📊 **AUC (평균 생존기간, {analysis_unit}) · 근사**")
+            st.markdown(
+                f"<span style='font-size:24px; font-weight:bold;'>{overall['AUC(일)'] / unit_days:.2f}{analysis_unit}</span>"
+                f" ± {1.96 * overall['AUC 표준오차(일)'] / unit_days:.2f}",
+                unsafe_allow_html=True
+            )
+        with col2:
+            st.markdown("☑️ **36개월 생존율 · 근사**")
+            st.markdown(
+                f"<span style='font-size:24px; font-weight:bold;'>{overall['생존율']*100:.1f}%</span>"
+                f" ± {1.96 * overall['생존율 표준오차']*100:.1f}%p",
+                unsafe_allow_html=True
+            )
+
+        st.plotly_chart(create_approximate_survival_curves(approx, unit=analysis_unit), use_container_width=True)
+
+        approx_table = pd.DataFrame({
+            "추정 수업 수": kpis["추정 수업 수"],
+            "중단율(%)": kpis["중단율(%)"],
+            f"AUC ({analysis_unit})": kpis["AUC(일)"] / unit_days,
+            f"AUC 95% 오차 (±{analysis_unit})": 1.96 * kpis["AUC 표준오차(일)"] / unit_days,
+            "36개월 생존율(%)": kpis["생존율"] * 100,
+            "생존율 95% 오차 (±%p)": 1.96 * kpis["생존율 표준오차"] * 100,
+        })
+        st.dataframe(approx_table.style.format("{:,.2f}").format({"추정 수업 수": "{:,.0f}"}), use_container_width=True)
+
+        @st.fragment(run_every=2)
+        def wait_for_exact_results():
+            """전체 처리 완료 여부 확인 (완료되면 페이지 전체 재실행)"""
+            if refresher.snapshot is not None:
+                st.rerun()
+            st.caption("🔄 전체 데이터로 정확한 결과 계산 중...")
+
+        wait_for_exact_results()
+        st.stop()
+
+    snapshot = refresher.snapshot
+else:
+    snapshot = refresher.snapshot
+
+# 공유 스냅샷의 세션별 뷰 (데이터 복사 없음)
+df_processed = session_view(snapshot.data)
+
+# 데이터 기준 시각 및 수동 갱신
+col_age, col_refresh = st.columns([4, 1])
+with col_age:
+    age_minutes = refresher.age() / 60
+    status_text = " · 🔄 갱신 중..." if refresher.is_refreshing else ""
+    st.caption(
+        f"🕒 데이터 기준: {snapshot.loaded_at.strftime('%Y-%m-%d %H:%M:%S')} "
+        f"({age_minutes:.0f}분 전){status_text}"
+    )
+    if refresher.last_error is not None:
+        st.caption(f"⚠️ 마지막 갱신 실패: {refresher.last_error} (이전 데이터 표시 중)")
+with col_refresh:
+    if st.button("데이터 새로고침"):
+        refresher.request_refresh()
 
 start_date = df_processed['결제등록일'].min().strftime("%Y-%m-%d")
 end_date   = df_processed['결제등록일'].max().strftime("%Y-%m-%d")
@@ -70,28 +194,15 @@ st.write("")
 st.markdown("#### 📊 생존분석 설정")
 analysis_unit = st.radio("분석 단위 선택", ["주", "개월"], horizontal=True, help="생존분석과 시각화에 사용할 시간 단위를 선택하세요")
 
-# 단위에 따른 duration 계산
-if analysis_unit == "주":
-    duration = df_processed['duration_days'] / 7  # 일을 주로 변환
-else:  # 개월
-    duration = df_processed['duration_days'] / 30.44  # 일을 개월로 변환 (평균 월 일수)
-
-# Kaplan-Meier 생존 분석
-kmf = KaplanMeierFitter()
-kmf.fit(durations=duration, event_observed=df_processed['이탈여부'], label="KM Estimate")
-
-# AUC 및 생존율 계산 (단위에 따라 조정)
-if analysis_unit == "주":
-    max_time = 36 * 4.35  # 36개월을 주로 변환 (약 156주)
-    time_point = 36 * 4.35  # 36개월 시점
-    time_label = "36개월"
-else:  # 개월
-    max_time = 36
-    time_point = 36
-    time_label = "36개월"
-
-auc_value = calculate_auc(kmf, max_time=max_time, unit=analysis_unit)
-survival_rate = calculate_survival_rate_at_time(kmf, time_point, unit=analysis_unit)
+# 일 단위 생존곡선은 스냅샷마다 한 번만 피팅하고, 단위 전환은 시간축 배율만 적용
+groups = PAY_MONTH_GROUPS
+curves = get_group_curves(snapshot.loaded_at, df_processed)
+overall_curve = curves["전체"]
+
+# AUC 및 36개월 생존율 (일 단위 적분값을 표시 단위로 환산)
+time_label = "36개월"
+auc_value = overall_curve.auc(analysis_unit, HORIZON_DAYS)
+survival_rate = overall_curve.survival_at(HORIZON_DAYS)
 
 # KPI 카드
 col1, col2 = st.columns(2)
@@ -105,25 +216,45 @@ with col2:
     st.markdown(f"<span style='font-size:24px; font-weight:bold;'>{survival_rate*100:.1f}%</span>", unsafe_allow_html=True)
 
 # Kaplan-Meier 생존 곡선
-fig = create_survival_curve(df_processed, unit=analysis_unit)
+fig = create_survival_curve(df_processed, unit=analysis_unit, curve=overall_curve)
 st.plotly_chart(fig, use_container_width=True)
 
 st.write("")
 
 # 결제개월수별 Kaplan-Meier 생존 곡선
-fig_grouped = create_grouped_survival_curves(df_processed, unit=analysis_unit)
+fig_grouped = create_grouped_survival_curves(df_processed, unit=analysis_unit, curves=curves)
 st.plotly_chart(fig_grouped, use_container_width=True)
 
+# 첫 적재 때 보여준 근사 결과의 실제 오차
+if refresher.preview is not None:
+    approx = refresher.preview.data
+    with st.expander(f"⚡ 근사 결과 오차 (층화 표본 {approx['sample_size']:,}건 vs 전체)"):
+        st.caption(
+            f"근사 계산 {approx['elapsed']:.1f}초. "
+            "구간 포함 = 근사 AUC의 95% 오차 범위 안에 정확한 AUC가 있는지, "
+            "밴드 포함률 = 정확한 곡선 시점 중 근사 오차 범위 안에 있는 비율 (36개월까지)"
+        )
+        st.dataframe(
+            approximation_error(approx, curves, unit=analysis_unit).round(3),
+            use_container_width=True, hide_index=True
+        )
+
 # -----------------------------
 # 2️⃣ 그룹별 요약 통계 추출
 # -----------------------------
-groups = [
-    ("전체", None),
-    ("1개월 구매", "1"),
-    ("3개월 구매", "3"),
-    ("6개월 구매", "6"),
-    ("12개월 구매", "12")
-]
+
+# 결제개월수 그룹 간 로그순위 검정 (하나의 이벤트 표에서 다집단 + 쌍별 계산)
+pay_month_labels = np.array([pay_month for _, pay_month in groups if pay_month is not None])
+event_table = build_event_table(
+    df_processed['duration_days'], df_processed['이탈여부'], df_processed['결제개월수'],
+    labels=pay_month_labels
+)
+logrank_overall = multigroup_test(event_table)
+logrank_pairwise = pairwise_tests(event_table)
+wilcoxon_pairwise = pairwise_tests(event_table, weighting="wilcoxon")
+
+base_pairs = logrank_pairwise[logrank_pairwise["그룹1"] == pay_month_labels[0]]
+p_vs_base = dict(zip(base_pairs["그룹2"], base_pairs["p값"]))
 
 results = []
 
@@ -138,31 +269,19 @@ for group_name, pay_month in groups:
         churn_count = data['이탈여부'].sum()   # 1=이탈, 0=생존
         churn_rate = churn_count / sample_size * 100
 
-        # 선택한 단위에 따라 duration 계산
-        if analysis_unit == "주":
-            group_duration = data['duration_days'] / 7
-            max_time = 36 * 4.35  # 36개월을 주로 변환
-            time_label_unit = "주"
-        else:  # 개월
-            group_duration = data['duration_days'] / 30.44
-            max_time = 36
-            time_label_unit = "개월"
-
-        kmf = KaplanMeierFitter()
-        kmf.fit(group_duration, event_observed=data["이탈여부"].astype(int))
-
-        # AUC 계산 (선택한 단위 기준)
-        auc_value = calculate_auc(kmf, max_time=max_time, unit=analysis_unit)
-
-        # 중위 생존기간
-        median_survival = kmf.median_survival_time_
-        if pd.isna(median_survival):
+        # 선택한 단위 기준 AUC / 중위 생존기간 (재피팅 없이 일 단위 곡선에서 환산)
+        curve = curves[group_name]
+        time_label_unit = analysis_unit
+        auc_value = curve.auc(analysis_unit, HORIZON_DAYS)
+
+        median_survival = curve.median(analysis_unit)
+        if not np.isfinite(median_survival):
             median_disp = "도달 안함"
         else:
             median_disp = f"{median_survival:.1f}{time_label_unit}"
 
         # 실제 관찰된 duration의 중앙값 (박스플롯과 비교용)
-        observed_median = group_duration.median()
+        observed_median = data['duration_days'].median() / UNIT_DAYS[analysis_unit]
 
         results.append({
             "구분": group_name,
@@ -170,7 +289,13 @@ for group_name, pay_month in groups:
             "중단율": f"{churn_rate:.1f}%",
             f"AUC (36개월, {time_label_unit})": f"{auc_value:.2f}{time_label_unit}",
             f"KM 중위생존기간": median_disp,
-            f"관찰 중앙값": f"{observed_median:.1f}{time_label_unit}"
+            f"관찰 중앙값": f"{observed_median:.1f}{time_label_unit}",
+            "로그순위 p (vs 1개월)": (
+                "-" if pay_month is None
+                else "기준" if pay_month == pay_month_labels[0]
+                else format_p_value(p_vs_base[pay_month]) if pay_month in p_vs_base
+                else "-"
+            )
         })
 
 # -----------------------------
@@ -179,6 +304,21 @@ for group_name, pay_month in groups:
 results_df = pd.DataFrame(results)
 st.table(results_df)   # 고정형 표
 
+st.caption(
+    f"결제개월수 그룹 간 로그순위 검정: χ²={logrank_overall['검정통계량']:.1f} "
+    f"(자유도 {logrank_overall['자유도']}), p={format_p_value(logrank_overall['p값'])}"
+)
+
+with st.expander("그룹 쌍별 비교 (로그순위 / Wilcoxon)"):
+    pairwise_df = logrank_pairwise.rename(columns={"검정통계량": "로그순위 χ²", "p값": "로그순위 p"})
+    pairwise_df["Wilcoxon χ²"] = wilcoxon_pairwise["검정통계량"]
+    pairwise_df["Wilcoxon p"] = wilcoxon_pairwise["p값"]
+    pairwise_df["그룹1"] = pairwise_df["그룹1"] + "개월"
+    pairwise_df["그룹2"] = pairwise_df["그룹2"] + "개월"
+    for col in ["로그순위 p", "Wilcoxon p"]:
+        pairwise_df[col] = pairwise_df[col].map(format_p_value)
+    st.dataframe(pairwise_df.round(2), use_container_width=True)
+
 st.write("")
 
 # -----------------------------
@@ -190,6 +330,125 @@ st.plotly_chart(fig_boxplot, use_container_width=True)
 
 st.write("")
 
+# -----------------------------
+# 5️⃣ 관측 기간 이후 외삽 (모수 생존모형)
+# -----------------------------
+st.subheader("🔭 관측 기간 이후 생존 외삽")
+st.caption("KM 곡선이 관측 기간 안에 0.5에 도달하지 않는 그룹도 모수모형으로 중위 생존기간과 평생 AUC를 추정합니다.")
+
+extrapolation_model = st.radio(
+    "외삽 모형",
+    list(MODELS.keys()),
+    format_func=lambda m: MODELS[m],
+    horizontal=True
+)
+extrapolation_fit, extrapolation_df = extrapolation_table(
+    df_processed,
+    labels=pay_month_labels,
+    model=extrapolation_model,
+    unit_days=UNIT_DAYS[analysis_unit]
+)
+extrapolation_df["구분"] = extrapolation_df["구분"] + "개월 구매"
+st.dataframe(
+    extrapolation_df.style.format({
+        "외삽 중위생존기간": f"{{:.1f}}{analysis_unit}",
+        "외삽 AUC": f"{{:.2f}}{analysis_unit}",
+        "AIC": "{:,.0f}",
+    }),
+    use_container_width=True
+)
+
+fig_extrapolation = create_extrapolation_chart(
+    df_processed,
+    extrapolation_fit,
+    unit=analysis_unit,
+    horizon_days=60 * UNIT_DAYS["개월"],
+    curves=curves
+)
+st.plotly_chart(fig_extrapolation, use_container_width=True)
+
+st.write("")
+
+# -----------------------------
+# 6️⃣ 활성 수업 이탈 위험 순위 (조건부 생존확률)
+# -----------------------------
+st.subheader("🚨 활성 수업 이탈 위험 순위")
+risk_weeks = st.slider("위험 평가 기간 (주)", min_value=1, max_value=12, value=4)
+st.caption(f"현재 재원기간 t에서 결제개월수별 KM 곡선의 S(t+{risk_weeks}주)/S(t)로 향후 {risk_weeks}주 내 이탈 위험을 계산합니다.")
+
+risk_df = get_risk_table(snapshot.loaded_at, risk_weeks, df_processed)
+st.dataframe(
+    risk_df.head(100).style.format({
+        f"{risk_weeks}주 유지확률": "{:.1%}",
+        f"{risk_weeks}주 이탈위험": "{:.1%}",
+    }),
+    use_container_width=True
+)
+st.download_button(
+    "전체 위험 순위 CSV 다운로드",
+    risk_df.to_csv(index=False).encode("utf-8-sig"),
+    file_name=f"active_lesson_risk_{risk_weeks}w.csv",
+    mime="text/csv"
+)
+
+st.write("")
+
+# -----------------------------
+# 7️⃣ 세그먼트별 생존분석 (학년 × 교과/탐구 × 결제개월수)
+# -----------------------------
+st.subheader("🧩 세그먼트별 생존분석")
+segment_cols = st.multiselect(
+    "세그먼트 기준",
+    ["학년", "교과/탐구", "결제개월수"],
+    default=["학년", "교과/탐구", "결제개월수"]
+)
+
+if segment_cols:
+    # 일 단위 AUC / 중위생존기간을 표시 단위로 나눔 (SurvivalCurve와 같은 단위 뷰)
+    segment_df = get_segment_table(snapshot.loaded_at, tuple(segment_cols), df_processed)
+    segment_df = segment_df.assign(**{
+        col: segment_df[col] / UNIT_DAYS[analysis_unit] for col in ["AUC", "중위생존기간"]
+    })
+    st.dataframe(
+        segment_df.style.format({
+            "샘플 수": "{:,}",
+            "이탈 수": "{:,}",
+            "중단율(%)": "{:.1f}",
+            "AUC": "{:.2f}",
+            "생존율": "{:.1%}",
+            "중위생존기간": "{:.1f}",
+        }),
+        use_container_width=True
+    )
+
+st.write("")
+
+# -----------------------------
+# 8️⃣ 고객 단위 생존 / 재구매 간격
+# -----------------------------
+st.subheader("👤 고객 단위 생존분석")
+st.caption("고객(user_No)의 첫 결제부터 마지막 수업 종료까지를 생존기간으로, 진행 중인 수업이 없으면 이탈로 봅니다.")
+
+lifetimes, customer_curve, gap_curves = get_customer_analysis(snapshot.loaded_at, df_processed)
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("고객 수", f"{len(lifetimes):,}명")
+with col2:
+    st.metric("고객당 평균 수업 수", f"{lifetimes['수업 수'].mean():.2f}개")
+with col3:
+    st.metric("고객 AUC", f"{customer_curve.auc(analysis_unit):.2f}{analysis_unit}")
+with col4:
+    st.metric("수업 AUC", f"{overall_curve.auc(analysis_unit):.2f}{analysis_unit}")
+
+col1, col2 = st.columns(2)
+with col1:
+    st.plotly_chart(create_customer_survival_chart(overall_curve, customer_curve, unit=analysis_unit), use_container_width=True)
+with col2:
+    st.plotly_chart(create_repurchase_chart(gap_curves, unit=analysis_unit), use_container_width=True)
+
+st.write("")
+
 # =============================================================================
 # 2️⃣ AUC 개선 목표 설정
 # =============================================================================
@@ -0,0 +1,77 @@
+import streamlit as st
+import pandas as pd
+from utils.load_googlesheet import get_sheet_refresher
+from utils.shared_store import session_view
+from utils.funnel import calculate_churn_funnel, FUNNEL_COLUMNS
+from utils.stages import STAGES, stage_transition_table
+from utils.visualization import create_churn_funnel_chart, create_stage_sankey
+
+st.set_page_config(
+    page_title="📉 이탈 퍼널 분석",
+    page_icon="📉",
+    layout="wide"
+)
+st.subheader("📉 월별 이탈 퍼널 (단계 / 초기 DONEMONTH)")
+
+refresher = get_sheet_refresher("이탈_RAW")
+
+if refresher.snapshot is None:
+    with st.status("구글시트 데이터 처리 중..."):
+        snapshot = refresher.wait()
+        st.success("처리가 완료되었습니다 ✅")
+else:
+    snapshot = refresher.snapshot
+
+# 공유 스냅샷의 세션별 뷰 (데이터 복사 없음)
+df_processed = session_view(snapshot.data)
+st.caption(f"🕒 데이터 기준: {snapshot.loaded_at.strftime('%Y-%m-%d %H:%M:%S')}")
+
+# 월 × 퍼널 단계 이탈률 (한 번의 crosstab)
+funnel_df = calculate_churn_funnel(df_processed)
+
+# 기간 평균 행 추가
+mean_row = funnel_df[FUNNEL_COLUMNS].mean().to_frame().T
+mean_row['연-월'] = "평균"
+mean_row['신규수업수'] = funnel_df['신규수업수'].sum()
+funnel_table = pd.concat([funnel_df, mean_row], ignore_index=True)
+
+st.dataframe(
+    funnel_table.style.format({
+        "신규수업수": "{:,.0f}",
+        **{col: "{:.2f}%" for col in FUNNEL_COLUMNS}
+    }),
+    use_container_width=True
+)
+
+st.plotly_chart(create_churn_funnel_chart(funnel_df), use_container_width=True)
+
+# -----------------------------
+# 단계 전이 (결제 → 과외신청서 → 매칭 → 첫수업 → 2회차)
+# -----------------------------
+st.subheader("🔀 단계 전이 분석 (코호트 월별)")
+st.caption("각 단계에서 진행 중인 수업은 해당 단계에서 중도절단으로 보고, 단계 축 Aalen-Johansen으로 전이/도달확률을 계산합니다.")
+
+stage_table = stage_transition_table(df_processed)
+cohorts = stage_table['연-월'].unique().tolist()
+cohort = st.selectbox("코호트 (결제 월)", cohorts[::-1], index=0)
+
+st.plotly_chart(create_stage_sankey(stage_table, cohort), use_container_width=True)
+
+# 코호트 × 단계 도달확률
+reach_table = (
+    stage_table
+    .pivot(index='연-월', columns='단계', values='도달확률')
+    .reindex(index=cohorts, columns=STAGES)
+)
+st.dataframe(reach_table.style.format("{:.1%}"), use_container_width=True)
+
+with st.expander("단계별 상세 (진입 / 이탈 / 진행 중 / 체류일수)"):
+    st.dataframe(
+        stage_table[stage_table['연-월'] == cohort].style.format({
+            "전이확률": "{:.1%}",
+            "이탈확률": "{:.1%}",
+            "도달확률": "{:.1%}",
+            "평균 체류일수": "{:.1f}",
+        }, na_rep="-"),
+        use_container_width=True
+    )
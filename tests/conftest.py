@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 루트에서 `pytest`로 실행해도 utils 패키지를 찾도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
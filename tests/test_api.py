@@ -0,0 +1,99 @@
+"""
+로컬 API 검사: 상태 코드 (200 / 304 / 400 / 404 / 500 / 503)와 연결 유지
+
+실행: python -m pytest -q tests/test_api.py
+"""
+import http.client
+import json
+import threading
+
+import pytest
+
+from utils import api
+from utils.api import create_server
+from utils.refresher import SnapshotRefresher
+from utils.synthetic import make_processed_sheet
+
+
+def _serve(refresher):
+    server = create_server(refresher, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    try:
+        data = body if isinstance(body, (bytes, type(None))) else json.dumps(body).encode("utf-8")
+        conn.request(method, path, body=data, headers=headers or {})
+        resp = conn.getresponse()
+        return resp.status, dict(resp.getheaders()), resp.read()
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope="module")
+def server():
+    refresher = SnapshotRefresher(fetch=lambda: make_processed_sheet(5_000, seed=0))
+    refresher.refresh()
+    server = _serve(refresher)
+    yield server
+    server.shutdown()
+
+
+def test_summary_and_etag(server):
+    status, headers, body = _request(server, "GET", "/summary")
+    assert status == 200
+    assert json.loads(body)["groups"][0]["구분"] == "전체"
+
+    status, _, _ = _request(server, "GET", "/summary", headers={"If-None-Match": headers["ETag"]})
+    assert status == 304
+
+
+@pytest.mark.parametrize("method, path, body, headers", [
+    ("POST", "/segments", {"segments": [{"학년": "고3"}], "unit": ["개월"]}, None),
+    ("POST", "/segments", {"segments": "고3"}, None),
+    ("POST", "/segments", b"\xff\xfe", None),
+    ("POST", "/segments", b"{}", {"Content-Length": "abc"}),
+    ("GET", "/summary?horizon=x", None, None),
+])
+def test_bad_requests_return_400(server, method, path, body, headers):
+    status, _, payload = _request(server, method, path, body, headers)
+    assert status == 400
+    assert "error" in json.loads(payload)
+
+
+def test_unknown_route_returns_404(server):
+    assert _request(server, "GET", "/nope")[0] == 404
+
+
+def test_unexpected_error_returns_500(server, monkeypatch):
+    def broken(params, state):
+        raise KeyError("boom")
+
+    monkeypatch.setattr(server.service, "curve", broken)
+    status, _, payload = _request(server, "GET", "/curve?group=3&horizon=99")
+    assert status == 500
+    assert json.loads(payload) == {"error": "internal server error"}
+
+
+def test_snapshot_unavailable_returns_503(monkeypatch):
+    def failing_fetch():
+        raise ConnectionError("worksheet unavailable")
+
+    monkeypatch.setattr(api, "SNAPSHOT_WAIT_SECONDS", 1)
+    refresher = SnapshotRefresher(fetch=failing_fetch)
+    refresher.refresh()
+    server = _serve(refresher)
+    try:
+        for method, path, body in [("GET", "/summary", None), ("POST", "/segments", {"segments": [{}]})]:
+            status, headers, payload = _request(server, method, path, body)
+            assert status == 503
+            assert headers["Retry-After"] == str(api.RETRY_AFTER_SECONDS)
+            assert "error" in json.loads(payload)
+
+        # 스냅샷 없이도 health는 응답
+        status, _, payload = _request(server, "GET", "/health")
+        assert status == 200 and json.loads(payload)["loaded_at"] is None
+    finally:
+        server.shutdown()
@@ -0,0 +1,48 @@
+"""
+모수 외삽 검사: 빈 그룹은 NaN, 세션 스레드 동시 적합 시 캐시 오류 없음
+
+실행: python -m pytest -q tests/test_extrapolation.py
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from utils.extrapolation import MODELS, extrapolation_table, fit_parametric, predict_survival
+from utils.synthetic import make_processed_sheet
+
+
+@pytest.fixture(scope="module")
+def df_processed():
+    return make_processed_sheet(20_000, seed=0)
+
+
+@pytest.mark.parametrize("model", list(MODELS))
+def test_empty_group_is_nan(df_processed, model):
+    base, _ = extrapolation_table(df_processed, labels=["1", "3", "12"], model=model)
+    fit, table = extrapolation_table(df_processed, labels=["1", "3", "없음", "12"], model=model)
+
+    assert np.isnan(fit["params"][2]).all()
+    assert table.iloc[2][["외삽 중위생존기간", "외삽 AUC", "AIC"]].isna().all()
+    assert np.isnan(predict_survival(fit, [30.0, 365.0])[2]).all()
+    np.testing.assert_allclose(fit["params"][[0, 1, 3]], base["params"])
+
+
+def test_concurrent_fits(df_processed):
+    errors = []
+
+    def run(i):
+        try:
+            for k in range(20):
+                sub = df_processed.iloc[(i * 20 + k) * 50:][:5_000]
+                fit_parametric(sub['duration_days'], sub['이탈여부'], sub['결제개월수'], model="piecewise")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, errors
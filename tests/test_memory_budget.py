@@ -0,0 +1,23 @@
+"""
+전처리 단계별 메모리 예산 회귀 검사 (utils.memory_profile.MEMORY_BUDGETS, 입력 행당 최대 할당 바이트)
+
+실행: python -m pytest -q tests/test_memory_budget.py
+"""
+import pandas as pd
+
+from utils.memory_profile import MEMORY_BUDGETS, check_memory_budget
+
+# 작은 크기에서는 고정 오버헤드 비중이 커서 행당 값이 커지므로 2만 행 이상으로 검사
+SIZES = (20_000, 50_000)
+
+
+def test_preprocessing_within_memory_budget():
+    passed, result = check_memory_budget(SIZES)
+
+    assert set(result["단계"]) == set(MEMORY_BUDGETS)
+    assert passed, "\n" + result.round(2).to_string(index=False)
+
+
+def test_budget_check_does_not_leak_copy_on_write():
+    check_memory_budget(SIZES[:1])
+    assert not pd.get_option("mode.copy_on_write")
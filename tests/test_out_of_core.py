@@ -0,0 +1,62 @@
+"""
+out-of-core KM 검사: 메모리 한도보다 큰 합성 데이터에서 인메모리 결과와 일치 + RSS 증가 상한
+
+실행: python -m pytest -q tests/test_out_of_core.py
+"""
+import gc
+
+import pytest
+
+from utils.data_processing import process_data
+from utils.memory_profile import RSSSampler
+from utils.modeling import perform_kaplan_meier_analysis
+from utils.out_of_core import perform_kaplan_meier_analysis_out_of_core, source_dates, write_crda_partitions
+from utils.synthetic import make_source_frame
+
+MEMORY_LIMIT = 2 * 1024 ** 2
+N_ROWS = 100_000
+
+# 배치 크기는 한도의 1/4 기준이므로 배치 + 집계표는 한도의 4배 안에 들어와야 함
+RSS_GROWTH_LIMIT = 4 * MEMORY_LIMIT
+
+
+@pytest.fixture(scope="module")
+def partitioned_source(tmp_path_factory):
+    source = make_source_frame(N_ROWS, seed=0)
+    root = str(tmp_path_factory.mktemp("partitions"))
+    write_crda_partitions(source, root, chunksize=20_000)
+    current_date, cutoff_date = source_dates(root)
+    return source, root, source['crda'].min(), current_date, cutoff_date
+
+
+def test_source_larger_than_memory_limit(partitioned_source):
+    source = partitioned_source[0]
+    assert source.memory_usage(index=True, deep=True).sum() > RSS_GROWTH_LIMIT
+
+
+def test_matches_in_memory_analysis(partitioned_source):
+    source, root, start, current_date, cutoff_date = partitioned_source
+
+    processed = process_data(source, start, current_date, cutoff_date)
+    _, expected_auc = perform_kaplan_meier_analysis(processed)
+
+    _, auc, summary = perform_kaplan_meier_analysis_out_of_core(
+        root, start, current_date, cutoff_date, memory_limit=MEMORY_LIMIT
+    )
+
+    assert summary['total_count'] == len(processed)
+    assert summary['finished_count'] == int(processed['churn'].sum())
+    assert auc == pytest.approx(expected_auc, rel=1e-12)
+
+
+def test_peak_rss_growth_bounded(partitioned_source):
+    _, root, start, current_date, cutoff_date = partitioned_source
+
+    # 첫 실행은 pyarrow 초기화 / 임포트 비용이 섞이므로 제외
+    perform_kaplan_meier_analysis_out_of_core(root, start, current_date, cutoff_date, memory_limit=MEMORY_LIMIT)
+    gc.collect()
+
+    with RSSSampler() as sampler:
+        perform_kaplan_meier_analysis_out_of_core(root, start, current_date, cutoff_date, memory_limit=MEMORY_LIMIT)
+
+    assert sampler.peak - sampler.baseline < RSS_GROWTH_LIMIT
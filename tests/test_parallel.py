@@ -0,0 +1,63 @@
+"""
+세그먼트 분석 검사: 세션 스레드 동시 호출 / 프로세스 풀 결과가 순차 결과와 같음
+
+실행: python -m pytest -q tests/test_parallel.py
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils import parallel
+from utils.parallel import analyze_groups_parallel
+from utils.synthetic import make_processed_sheet
+
+SEGMENT_COLS = ["학년", "결제개월수"]
+
+
+def test_sequential_path_does_not_use_module_state():
+    """
+    순차 경로는 워커 전역(_SHARED)을 읽거나 지우지 않음
+    - 같은 프로세스의 다른 세션 스레드가 쓰고 있는 배열이 있다고 가정
+    """
+    df = make_processed_sheet(20_000, seed=0)
+    expected, _ = analyze_groups_parallel(df, SEGMENT_COLS, n_workers=1)
+
+    other_session = {"durations": np.zeros(10), "events": np.ones(10, dtype=np.int8)}
+    parallel._SHARED.update(other_session)
+    try:
+        result, _ = analyze_groups_parallel(df, SEGMENT_COLS, n_workers=1)
+        assert parallel._SHARED == other_session
+    finally:
+        parallel._SHARED.clear()
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_concurrent_calls_match_sequential():
+    frames = [make_processed_sheet(20_000, seed=seed) for seed in range(4)]
+    expected = [analyze_groups_parallel(df, SEGMENT_COLS, n_workers=1)[0] for df in frames]
+    errors = []
+
+    def run(i):
+        try:
+            for _ in range(5):
+                result, _ = analyze_groups_parallel(frames[i], SEGMENT_COLS, n_workers=1)
+                pd.testing.assert_frame_equal(result, expected[i])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(frames))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, errors
+
+
+def test_process_pool_matches_sequential():
+    df = make_processed_sheet(20_000, seed=0)
+    sequential, _ = analyze_groups_parallel(df, SEGMENT_COLS, n_workers=1)
+    pooled, _ = analyze_groups_parallel(df, SEGMENT_COLS, n_workers=2)
+    pd.testing.assert_frame_equal(pooled, sequential)
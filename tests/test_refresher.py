@@ -0,0 +1,134 @@
+"""
+백그라운드 갱신 검사: 느리거나 실패하는 가짜 워크시트로 스냅샷 교체 / 유지 확인
+
+실행: python -m pytest -q tests/test_refresher.py
+"""
+import threading
+import time
+
+import pytest
+
+from utils.refresher import SnapshotRefresher
+
+
+class FakeWorksheet:
+    """
+    가짜 구글시트 로드 함수
+    - slow=True: release()가 호출될 때까지 대기 (느린 시트)
+    - fail=True: 예외 발생 (시트 오류)
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.slow = False
+        self.fail = False
+        self.started = threading.Event()
+        self._gate = threading.Event()
+
+    def release(self):
+        self._gate.set()
+
+    def __call__(self):
+        self.started.set()
+        if self.slow:
+            self._gate.wait(5)
+            time.sleep(0.05)
+        if self.fail:
+            raise ConnectionError("worksheet unavailable")
+        self.version += 1
+        return {"version": self.version, "rows": list(range(1_000))}
+
+
+def process(raw):
+    # 처리 결과는 원본과 별개 객체 (처리 중 일부만 보이면 rows 길이가 달라짐)
+    return {"version": raw["version"], "rows": [r * 2 for r in raw["rows"]]}
+
+
+def test_previous_snapshot_served_while_refreshing_then_swapped():
+    sheet = FakeWorksheet()
+    refresher = SnapshotRefresher(fetch=sheet, process=process)
+    assert refresher.refresh()
+    first = refresher.wait()
+
+    sheet.slow = True
+    sheet.started.clear()
+    worker = threading.Thread(target=refresher.refresh)
+    worker.start()
+    assert sheet.started.wait(5)
+
+    # 갱신 중에도 이전 스냅샷을 기다리지 않고 반환
+    seen = []
+    start = time.perf_counter()
+    for _ in range(100):
+        seen.append(refresher.wait(timeout=1))
+    assert time.perf_counter() - start < 0.5
+    assert refresher.is_refreshing
+    assert all(s is first for s in seen)
+
+    # 교체 시점에 읽는 스레드는 이전 또는 새 스냅샷 전체만 봄
+    observed = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            observed.append(refresher.snapshot)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    sheet.release()
+    worker.join(5)
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    second = refresher.snapshot
+    assert second is not first
+    assert second.data["version"] == 2 and second.loaded_at > first.loaded_at
+    assert {id(s) for s in observed} <= {id(first), id(second)}
+    assert all(len(s.data["rows"]) == 1_000 for s in observed)
+    assert not refresher.is_refreshing
+
+
+def test_failed_refresh_keeps_last_good_snapshot():
+    sheet = FakeWorksheet()
+    refresher = SnapshotRefresher(fetch=sheet, process=process)
+    assert refresher.refresh()
+    good = refresher.snapshot
+
+    sheet.fail = True
+    assert not refresher.refresh()
+    assert refresher.snapshot is good
+    assert refresher.wait(timeout=1) is good
+    assert isinstance(refresher.last_error, ConnectionError)
+
+    # 다음 갱신이 성공하면 오류 기록 해제
+    sheet.fail = False
+    assert refresher.refresh()
+    assert refresher.snapshot.data["version"] == 2
+    assert refresher.last_error is None
+
+
+def test_first_load_failure_is_reported():
+    sheet = FakeWorksheet()
+    sheet.fail = True
+    refresher = SnapshotRefresher(fetch=sheet, process=process)
+    assert not refresher.refresh()
+
+    assert refresher.snapshot is None
+    with pytest.raises(RuntimeError):
+        refresher.wait(timeout=1)
+
+
+def test_background_thread_refreshes_on_request():
+    sheet = FakeWorksheet()
+    refresher = SnapshotRefresher(fetch=sheet, process=process, interval=3600).start()
+    try:
+        first = refresher.wait(timeout=5)
+        refresher.request_refresh()
+        deadline = time.monotonic() + 5
+        while refresher.snapshot is first and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert refresher.snapshot.data["version"] == 2
+    finally:
+        refresher.stop()
@@ -0,0 +1,48 @@
+"""
+활성 수업 위험 점수 검사: 일 격자 경로가 KM 곡선 조회(conditional_survival)와 같은 결과
+
+실행: python -m pytest -q tests/test_scoring.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.scoring import conditional_survival, score_active_lessons
+from utils.survival import SurvivalCurve
+from utils.synthetic import make_processed_sheet
+
+
+@pytest.fixture(scope="module")
+def df_processed():
+    df = make_processed_sheet(50_000, seed=0)
+    # 그룹 값이 없는 수업은 전체 곡선으로 평가
+    df.loc[df.index[:200], '결제개월수'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("horizon_weeks", [1, 4, 12])
+def test_dense_path_matches_curve_lookup(df_processed, horizon_weeks):
+    scored = score_active_lessons(df_processed, horizon_weeks=horizon_weeks)
+
+    codes, labels = pd.factorize(df_processed['결제개월수'])
+    durations = df_processed['duration_days'].to_numpy(dtype=np.float64)
+    events = df_processed['이탈여부'].to_numpy()
+    curves = [SurvivalCurve.fit(durations[codes == g], events[codes == g]) for g in range(len(labels))]
+    curves.append(SurvivalCurve.fit(durations, events))
+
+    active = events == 0
+    group_idx = np.where(codes[active] < 0, len(labels), codes[active])
+    expected = conditional_survival(curves, group_idx, durations[active], horizon_weeks * 7)
+    order = np.argsort(expected, kind='stable')
+
+    assert len(scored) == active.sum()
+    np.testing.assert_allclose(scored[f'{horizon_weeks}주 유지확률'], expected[order], rtol=1e-12)
+    np.testing.assert_array_equal(scored['위험순위'], np.arange(1, len(scored) + 1))
+    assert scored[f'{horizon_weeks}주 이탈위험'].is_monotonic_decreasing
+
+
+def test_non_integer_durations_use_sorted_path(df_processed):
+    shifted = df_processed.assign(duration_days=df_processed['duration_days'] + 0.5)
+    scored = score_active_lessons(shifted)
+    assert scored['4주 이탈위험'].is_monotonic_decreasing
+    assert scored['duration_days'].mod(1).eq(0.5).all()
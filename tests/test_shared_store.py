@@ -0,0 +1,27 @@
+"""
+공유 스냅샷 + 세션 뷰 검사: 세션 수가 늘어도 세션당 메모리가 스냅샷 복사 수준으로 늘지 않음
+
+실행: python -m pytest -q tests/test_shared_store.py
+"""
+import pandas as pd
+
+from utils.shared_store import check_session_memory, session_view
+from utils.synthetic import make_processed_sheet
+
+
+def test_session_view_does_not_modify_snapshot():
+    shared = make_processed_sheet(1_000, seed=0)
+    expected = shared.copy(deep=True)
+
+    with pd.option_context("mode.copy_on_write", True):
+        view = session_view(shared)
+        view['duration_days'] = view['duration_days'] * 2
+        view.loc[view.index[0], '학년'] = '변경'
+        view['추가 컬럼'] = 1
+
+    pd.testing.assert_frame_equal(shared, expected)
+
+
+def test_session_memory_does_not_grow_with_sessions():
+    passed, result = check_session_memory(n_sessions=(1, 10), n_rows=20_000)
+    assert passed, "\n" + result.round(3).to_string(index=False)
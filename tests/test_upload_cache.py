@@ -0,0 +1,50 @@
+"""
+업로드 캐시 검사: 여러 세션 스레드 동시 조회, load_data와 같은 기준일
+
+실행: python -m pytest -q tests/test_upload_cache.py
+"""
+import io
+import threading
+
+import pandas as pd
+
+from utils import upload_cache
+from utils.data_processing import load_data
+from utils.synthetic import make_source_frame
+
+
+def _csv_bytes(seed):
+    return make_source_frame(2_000, seed=seed).to_csv(index=False).encode("utf-8")
+
+
+def test_reference_dates_match_load_data(tmp_path):
+    data = _csv_bytes(0)
+    _, current, cutoff = load_data(io.BytesIO(data))
+    _, cached_current, cached_cutoff, _ = upload_cache.load_data_cached(io.BytesIO(data), cache_dir=str(tmp_path))
+
+    assert (cached_current, cached_cutoff) == (current, cutoff)
+
+
+def test_concurrent_sessions(tmp_path):
+    files = [_csv_bytes(seed) for seed in range(upload_cache.MEMORY_CACHE_SIZE + 2)]
+    expected = [len(pd.read_csv(io.BytesIO(data))) for data in files]
+    errors = []
+
+    def session(offset):
+        try:
+            for k in range(12):
+                i = (offset + k) % len(files)
+                df, *_ = upload_cache.load_data_cached(io.BytesIO(files[i]), cache_dir=str(tmp_path))
+                assert len(df) == expected[i]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(offset,)) for offset in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, errors
+    assert len(upload_cache._MEMORY_CACHE) <= upload_cache.MEMORY_CACHE_SIZE
+    assert not list(tmp_path.glob("*.tmp"))
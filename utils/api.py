@@ -0,0 +1,357 @@
+"""
+로컬 생존분석 HTTP API (대시보드와 같은 수치를 다른 도구에서 조회)
+
+실행:
+    python -m utils.api --port 8502                 # 구글시트 (이탈_RAW) 스냅샷
+    python -m utils.api --port 8502 --synthetic 200000   # 합성 데이터 (로컬 테스트)
+
+엔드포인트 (JSON):
+    GET  /health
+    GET  /summary?unit=개월&horizon=36                 결제개월수 그룹별 요약
+    GET  /curve?group=3&unit=주&horizon=52            곡선 배열 (group 생략 시 전체)
+    POST /segments  {"segments": [{"학년": "고3", "결제개월수": "3"}, ...], "unit": "개월", "horizon": 36}
+
+- 처리된 데이터와 그룹별 일 단위 곡선을 프로세스에 유지 (스냅샷이 바뀔 때만 재피팅)
+- 응답은 (스냅샷 시각, 요청) 기준으로 캐시하고 ETag / If-None-Match(304) 지원
+"""
+import argparse
+import hashlib
+import json
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from utils.refresher import SnapshotRefresher
+from utils.survival import HORIZON_DAYS, PAY_MONTH_GROUPS, UNIT_DAYS, SurvivalCurve, fit_group_curves
+
+# 세그먼트 조회에 허용하는 컬럼
+SEGMENT_COLUMNS = ['학년', '교과/탐구', '결제개월수']
+
+RESPONSE_CACHE_SIZE = 256
+MAX_SEGMENTS = 200
+
+# 스냅샷이 아직 없을 때 요청이 기다리는 최대 시간 (초과 시 503)
+SNAPSHOT_WAIT_SECONDS = 10
+# 503 응답의 Retry-After (초)
+RETRY_AFTER_SECONDS = 5
+
+
+class BadRequest(ValueError):
+    """잘못된 요청 파라미터 (400 응답)"""
+
+
+class SnapshotUnavailable(RuntimeError):
+    """스냅샷이 아직 적재되지 않았거나 첫 적재가 실패함 (503 응답)"""
+
+
+def _error(status, message):
+    return status, json.dumps({"error": message}, ensure_ascii=False).encode("utf-8"), None
+
+
+def _finite(value):
+    """JSON 직렬화용 (inf/nan → None)"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _curve_summary(curve, unit, horizon_days):
+    return {
+        "AUC": _finite(curve.auc(unit, horizon_days)),
+        "생존율": _finite(curve.survival_at(horizon_days)),
+        "중위생존기간": _finite(curve.median(unit)),
+    }
+
+
+class AnalyticsService:
+    """
+    스냅샷별 분석 결과를 메모리에 유지하는 서비스
+    - refresher: SnapshotRefresher (snapshot.data = processing_google_sheet 결과)
+    - 곡선은 스냅샷 적재 시각이 바뀔 때만 다시 피팅
+    """
+
+    def __init__(self, refresher):
+        self.refresher = refresher
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._curves = None
+        self._cache = OrderedDict()
+
+    def _state(self):
+        """
+        현재 (스냅샷 적재 시각, 스냅샷, 그룹별 곡선) - 한 요청은 이 값 하나로 캐시 키와 응답을 모두 만듦
+        - 스냅샷 교체 시 곡선/응답 캐시 초기화
+        - 락 안에서 최신 스냅샷을 다시 읽어 늦게 도착한 요청이 이전 스냅샷으로 되돌리지 않음
+        """
+        try:
+            self.refresher.wait(timeout=SNAPSHOT_WAIT_SECONDS)
+        except (RuntimeError, TimeoutError) as e:
+            raise SnapshotUnavailable(str(e)) from e
+        with self._lock:
+            snapshot = self.refresher.snapshot
+            if snapshot.loaded_at != self._loaded_at:
+                self._curves = fit_group_curves(snapshot.data, PAY_MONTH_GROUPS)
+                self._loaded_at = snapshot.loaded_at
+                self._cache.clear()
+            return self._loaded_at, snapshot, self._curves
+
+    @staticmethod
+    def _parse_unit(params):
+        unit = params.get("unit", "개월")
+        if not isinstance(unit, str) or unit not in UNIT_DAYS:
+            raise BadRequest(f"unit은 {list(UNIT_DAYS)} 중 하나여야 합니다")
+        try:
+            horizon = float(params["horizon"]) * UNIT_DAYS[unit] if "horizon" in params else HORIZON_DAYS
+        except (TypeError, ValueError):
+            raise BadRequest("horizon은 숫자여야 합니다")
+        if horizon <= 0:
+            raise BadRequest("horizon은 0보다 커야 합니다")
+        return unit, horizon
+
+    def health(self, params):
+        snapshot = self.refresher.snapshot
+        return {
+            "loaded_at": None if snapshot is None else snapshot.loaded_at.isoformat(),
+            "rows": None if snapshot is None else len(snapshot.data),
+            "refreshing": self.refresher.is_refreshing,
+        }
+
+    def summary(self, params, state):
+        """결제개월수 그룹별 샘플 수 / 중단율 / AUC / 생존율 / 중위생존기간 (대시보드 그룹 표와 동일)"""
+        unit, horizon = self._parse_unit(params)
+        _, snapshot, curves = state
+        df = snapshot.data
+
+        rows = []
+        for name, value in PAY_MONTH_GROUPS:
+            if name not in curves:
+                continue
+            events = df['이탈여부'] if value is None else df.loc[df['결제개월수'] == value, '이탈여부']
+            rows.append({
+                "구분": name,
+                "샘플 수": int(len(events)),
+                "중단율(%)": _finite(events.mean() * 100),
+                **_curve_summary(curves[name], unit, horizon),
+            })
+        return {"unit": unit, "horizon_days": horizon, "groups": rows}
+
+    def curve(self, params, state):
+        """그룹 곡선 배열 (표시 단위 시간축, horizon까지)"""
+        unit, horizon = self._parse_unit(params)
+        _, _, curves = state
+
+        group = params.get("group")
+        name = next((n for n, v in PAY_MONTH_GROUPS if v == group), None)
+        if name is None or name not in curves:
+            raise BadRequest(f"group은 {[v for _, v in PAY_MONTH_GROUPS if v is not None]} 중 하나이거나 생략해야 합니다")
+
+        curve = curves[name]
+        mask = curve.timeline_days <= horizon
+        return {
+            "group": name,
+            "unit": unit,
+            "timeline": curve.timeline(unit)[mask].tolist(),
+            "survival": curve.survival[mask].tolist(),
+        }
+
+    def segments(self, body, state):
+        """세그먼트 목록 일괄 조회 (세그먼트 = SEGMENT_COLUMNS 값 조건의 AND)"""
+        segments = body.get("segments")
+        if not isinstance(segments, list) or not segments:
+            raise BadRequest("segments는 비어있지 않은 목록이어야 합니다")
+        if len(segments) > MAX_SEGMENTS:
+            raise BadRequest(f"segments는 최대 {MAX_SEGMENTS}개까지 조회할 수 있습니다")
+
+        unit, horizon = self._parse_unit(body)
+        _, snapshot, _ = state
+        df = snapshot.data
+
+        # 컬럼별 값 → 행 마스크는 요청 안에서 한 번만 계산
+        masks = {}
+        rows = []
+        for segment in segments:
+            if not isinstance(segment, dict) or not set(segment) <= set(SEGMENT_COLUMNS):
+                raise BadRequest(f"세그먼트 조건은 {SEGMENT_COLUMNS} 컬럼만 사용할 수 있습니다")
+
+            mask = np.ones(len(df), dtype=bool)
+            for col, value in segment.items():
+                key = (col, str(value))
+                if key not in masks:
+                    masks[key] = (df[col].astype(str) == str(value)).to_numpy()
+                mask &= masks[key]
+
+            n = int(mask.sum())
+            row = {"segment": segment, "샘플 수": n}
+            if n > 0:
+                curve = SurvivalCurve.fit(df['duration_days'].to_numpy()[mask], df['이탈여부'].to_numpy()[mask])
+                row["중단율(%)"] = _finite(df['이탈여부'].to_numpy()[mask].mean() * 100)
+                row.update(_curve_summary(curve, unit, horizon))
+            rows.append(row)
+        return {"unit": unit, "horizon_days": horizon, "segments": rows}
+
+    def handle(self, method, path, params, body=None):
+        """
+        요청 처리 + 응답 캐시
+        - 400: 잘못된 파라미터, 404: 없는 경로, 503: 스냅샷 없음 (Retry-After), 500: 그 밖의 오류
+        반환: (HTTP 상태, 응답 bytes, ETag)
+        """
+        routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/summary"): self.summary,
+            ("GET", "/curve"): self.curve,
+            ("POST", "/segments"): self.segments,
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            return _error(404, "not found")
+
+        try:
+            return self._handle(handler, method, path, params, body)
+        except BadRequest as e:
+            return _error(400, str(e))
+        except SnapshotUnavailable as e:
+            return _error(503, f"데이터 스냅샷을 사용할 수 없습니다: {e}")
+        except Exception as e:
+            print(f"[{datetime.now()}] API 요청 처리 실패 ({method} {path}): {e!r}")
+            return _error(500, "internal server error")
+
+    def _handle(self, handler, method, path, params, body):
+        """라우팅된 요청 처리 (오류는 handle에서 상태 코드로 변환)"""
+        if path == "/health":
+            payload = json.dumps(handler(params), ensure_ascii=False).encode("utf-8")
+            return 200, payload, None
+
+        request = body if method == "POST" else params
+        state = self._state()
+        loaded_at = state[0]
+        key = (loaded_at, path, json.dumps(request, sort_keys=True, ensure_ascii=False))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return (200, *self._cache[key])
+
+        payload = json.dumps(handler(request, state), ensure_ascii=False).encode("utf-8")
+
+        etag = '"' + hashlib.blake2b(payload, digest_size=12).hexdigest() + '"'
+        with self._lock:
+            # 응답을 만드는 동안 스냅샷이 교체됐으면 (캐시 초기화 이후) 이전 스냅샷 응답은 저장하지 않음
+            if loaded_at == self._loaded_at:
+                self._cache[key] = (payload, etag)
+                if len(self._cache) > RESPONSE_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return 200, payload, etag
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self, method, body=None):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            status, payload, etag = service.handle(method, url.path, params, body)
+
+            if etag is not None and etag == self.headers.get("If-None-Match"):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            if status == 503:
+                self.send_header("Retry-After", str(RETRY_AFTER_SECONDS))
+            if etag is not None:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._respond("GET")
+
+        def _bad_request(self, message):
+            _, payload, _ = _error(400, message)
+            self.send_response(400)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            # 본문을 읽지 못했으므로 연결을 재사용하지 않음
+            self.send_header("Connection", "close")
+            self.close_connection = True
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._bad_request("Content-Length 헤더가 올바르지 않습니다")
+                return
+
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:  # JSONDecodeError / UnicodeDecodeError
+                body = None
+            if not isinstance(body, dict):
+                self._bad_request("JSON 객체 본문이 필요합니다")
+                return
+            self._respond("POST", body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def create_server(refresher, host="127.0.0.1", port=8502):
+    """워밍된 AnalyticsService를 쓰는 HTTP 서버 생성 (serve_forever는 호출하는 쪽에서)"""
+    service = AnalyticsService(refresher)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="생존분석 로컬 HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--worksheet", default="이탈_RAW")
+    parser.add_argument("--interval", type=int, default=600, help="구글시트 갱신 주기 (초)")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 데이터 행 수 (0이면 구글시트 사용)")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from utils.synthetic import make_processed_sheet
+        refresher = SnapshotRefresher(fetch=lambda: make_processed_sheet(args.synthetic), interval=args.interval)
+    else:
+        from utils.load_googlesheet import fetch_google_sheets_data, processing_google_sheet
+        refresher = SnapshotRefresher(
+            fetch=lambda: fetch_google_sheets_data(args.worksheet),
+            process=processing_google_sheet,
+            interval=args.interval
+        )
+
+    refresher.start()
+    server = create_server(refresher, args.host, args.port)
+    # 첫 요청 지연을 없애기 위해 기동 시 스냅샷 적재 + 곡선 피팅
+    server.service.handle("GET", "/summary", {})
+    print(f"생존분석 API 실행 중: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        refresher.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,19 @@
 import streamlit as st
 import pandas as pd
 
+from utils.periods import month_codes
+
+# 기준일(CUTOFF_DATE) = 데이터 최신 crda - CUTOFF_DAYS (이 날짜 이전에 마지막 수업이면 암묵적 이탈)
+CUTOFF_DAYS = 30
+
+def reference_dates(df):
+    """
+    데이터 기준 날짜 (load_data / 업로드 캐시 / out-of-core가 같은 기준 사용)
+    반환: (CURRNET_DATE = 최신 crda, CUTOFF_DATE = CURRNET_DATE - CUTOFF_DAYS)
+    """
+    CURRNET_DATE = df['crda'].max()
+    return CURRNET_DATE, CURRNET_DATE - pd.Timedelta(days=CUTOFF_DAYS)
+
 def load_data(uploaded_file=None):
     """데이터를 로드하고 전처리하는 함수"""
     if uploaded_file is not None:
@@ -19,18 +32,51 @@ def load_data(uploaded_file=None):
         df['lst_tutoring_datetime'],
         errors='coerce'
     )
-    
-    CURRNET_DATE = df['crda'].max()
-    CUTOFF_DATE = CURRNET_DATE - pd.Timedelta(days=30)
+
+    # crda 연-월 정수 코드 (월별 분포 차트 집계용)
+    df['crda_month_code'] = month_codes(df['crda'])
+
+    CURRNET_DATE, CUTOFF_DATE = reference_dates(df)
     return df, CURRNET_DATE, CUTOFF_DATE
 
+# 완료 상태 정의
+FINISHED_STATES = ['FINISH', 'AUTO_FINISH', 'DONE', 'NOCARD', 'NOPAY']
+
+# done_month 1개월 = 4주 (컬럼명세서 기준)
+DONE_MONTH_DAYS = 28
+
+def determine_status_and_correct_month(df, CUTOFF_DATE):
+    """
+    완료 상태 판정 및 done_month 보정 (벡터화)
+    1) 명시적 완료 상태 → 이탈
+    2) ACTIVE이지만 마지막 수업일이 기준일보다 이전 → 이탈
+       - done_month가 실제 수업 기간(28일 = 1개월)보다 크면 실제 기간의 80%로 보정
+    """
+    done_month = df['done_month']
+    corrected_done_month = done_month.fillna(0)
+
+    explicit = df['tutoring_state'].isin(FINISHED_STATES)
+    implicit = (
+        ~explicit &
+        (df['tutoring_state'] == 'ACTIVE') &
+        df['lst_tutoring_datetime'].notna() &
+        (df['lst_tutoring_datetime'] < CUTOFF_DATE)
+    )
+
+    # 실제 수업 기간 계산 (28일 = 1개월로 가정)
+    actual_months = (df['lst_tutoring_datetime'] - df['crda']).dt.days / DONE_MONTH_DAYS
+    needs_correction = implicit & df['crda'].notna() & (done_month > actual_months)
+    corrected_done_month = corrected_done_month.mask(needs_correction, actual_months * 0.8)
+
+    return pd.DataFrame({
+        'churn': explicit | implicit,
+        'done_month_corrected': corrected_done_month
+    }, index=df.index)
+
 def process_data(df, START_DATE, END_DATE, CUTOFF_DATE):
     """
     원본 데이터를 분석용으로 전처리
     """
-    # 완료 상태 정의
-    FINISHED_STATES = ['FINISH', 'AUTO_FINISH', 'DONE', 'NOCARD', 'NOPAY']
-
     # 1. 기간 필터링
     st.write(f"📆 기간 필터링: {START_DATE.strftime('%Y-%m-%d')} ~ {END_DATE.strftime('%Y-%m-%d')}")
 
@@ -41,49 +87,24 @@ def process_data(df, START_DATE, END_DATE, CUTOFF_DATE):
         (df['crda'] <= pd.to_datetime(END_DATE))
     )
 
-    filtered_data = df[valid_pay_date & in_period].copy()
+    # 불리언 필터 결과는 이미 원본과 분리된 새 DataFrame이므로 추가 .copy() 없이 컬럼 추가
+    filtered_data = df[valid_pay_date & in_period]
 
     # 고유한 수업 식별자 생성 (lecture_vt_No + p_rn)
-    filtered_data['lesson_id'] = (filtered_data['lecture_vt_No'].astype(str) + '_' +
-                                filtered_data['p_rn'].astype(str))
+    # (astype(str) 두 번 + 문자열 덧셈은 전체 크기 문자열 배열을 세 번 만들므로 한 번에 생성)
+    filtered_data['lesson_id'] = pd.Series(
+        [f"{vt}_{rn}" for vt, rn in zip(filtered_data['lecture_vt_No'].tolist(), filtered_data['p_rn'].tolist())],
+        index=filtered_data.index, dtype=object
+    )
 
     st.success(f"✅ 기간 필터링 결과: {len(filtered_data):,}개 행 (원본의 {len(filtered_data)/len(df)*100:.1f}%)")
 
     # 2. 수업 완료 상태 및 done_month 보정
-
-    def determine_status_and_correct_month(row):
-        """각 행의 완료 상태 판정 및 done_month 보정"""
-        churn = False
-        corrected_done_month = row['done_month'] if pd.notna(row['done_month']) else 0
-
-        # 1) 명시적 완료 상태 확인
-        if row['tutoring_state'] in FINISHED_STATES:
-            churn = True
-
-        # 2) 암시적 완료 상태 확인 (ACTIVE이지만 마지막 수업일이 기준일보다 이전)
-        elif (row['tutoring_state'] == 'ACTIVE' and
-              pd.notna(row['lst_tutoring_datetime']) and
-              row['lst_tutoring_datetime'] < CUTOFF_DATE):
-            churn = True
-
-            # done_month 보정 로직
-            if (pd.notna(row['crda']) and pd.notna(row['lst_tutoring_datetime'])):
-                # 실제 수업 기간 계산 (28일 = 1개월로 가정)
-                actual_days = (row['lst_tutoring_datetime'] - row['crda']).days
-                actual_months = actual_days / 28
-
-                # done_month가 실제 기간보다 크면 보정
-                if row['done_month'] > actual_months:
-                    corrected_done_month = actual_months * 0.8  # 80%로 보정
-
-        return pd.Series({
-            'churn': churn,
-            'done_month_corrected': corrected_done_month
-        })
-
-    # 상태 및 보정 적용
-    status_correction = filtered_data.apply(determine_status_and_correct_month, axis=1)
-    processed_data = pd.concat([filtered_data, status_correction], axis=1)
+    # concat으로 전체를 다시 복사하지 않고 보정 컬럼만 추가
+    status_correction = determine_status_and_correct_month(filtered_data, CUTOFF_DATE)
+    processed_data = filtered_data
+    for col, values in status_correction.items():
+        processed_data[col] = values
 
     # 결과 요약
     total_count = len(processed_data)
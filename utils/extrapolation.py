@@ -0,0 +1,309 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from scipy.integrate import trapezoid
+from scipy.optimize import minimize
+from scipy.special import expit, gamma
+
+# 모형 종류
+MODELS = {
+    "weibull": "Weibull",
+    "loglogistic": "Log-logistic",
+    "piecewise": "Piecewise exponential",
+}
+
+# piecewise exponential 구간 경계 (일): 1·3·6·12·24개월, 마지막 구간 위험률로 외삽
+DEFAULT_BREAKS = (0, 28, 91, 182, 365, 730)
+
+# 0일 생존기간은 로그 위험함수가 정의되지 않으므로 반나절로 보정
+MIN_DURATION = 0.5
+
+# 세션 스레드 / API 요청 스레드가 함께 쓰므로 조회·갱신은 _FIT_CACHE_LOCK 안에서만
+_FIT_CACHE = OrderedDict()
+_FIT_CACHE_SIZE = 32
+_FIT_CACHE_LOCK = threading.Lock()
+
+
+def data_fingerprint(*arrays):
+    """입력 배열 내용 기반 해시 (캐시 키)"""
+    h = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        h.update(str(arr.dtype).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _aggregate(durations, events, group_idx):
+    """(그룹, 시간, 이탈여부) 조합별 가중치로 압축 - duration_days가 7일 버킷이라 행 수가 크게 줄어듦"""
+    table = pd.DataFrame({"g": group_idx, "t": durations, "e": events})
+    agg = table.groupby(["g", "t", "e"], sort=False).size().reset_index(name="w")
+    return (
+        agg["g"].to_numpy(),
+        np.maximum(agg["t"].to_numpy(dtype=np.float64), MIN_DURATION),
+        agg["e"].to_numpy(dtype=np.float64),
+        agg["w"].to_numpy(dtype=np.float64),
+    )
+
+
+def _loglik(theta, g, t, e, w, n_groups, model):
+    """
+    전체 그룹 공용 로그우도 + 그래디언트 (벡터화)
+    - theta: [log scale, log shape] × 그룹 수 를 펼친 배열
+    - 그룹끼리 독립이므로 합계 최대화 = 그룹별 최대화
+    반환: (그룹별 로그우도, theta에 대한 그래디언트)
+    """
+    params = theta.reshape(n_groups, 2)
+    a = params[g, 0]
+    b = params[g, 1]
+    shape = np.exp(b)
+    z = np.log(t) - a
+
+    if model == "weibull":
+        u = shape * z
+        cum_hazard = np.exp(u)
+        ll = e * (b - a + (shape - 1) * z) - cum_hazard
+        grad_a = shape * (cum_hazard - e)
+        grad_b = e * (1 + u) - cum_hazard * u
+    else:  # loglogistic
+        u = shape * z
+        log1p_term = np.logaddexp(0, u)
+        sig = expit(u)
+        ll = e * (b - a + (shape - 1) * z) - (1 + e) * log1p_term
+        grad_a = shape * ((1 + e) * sig - e)
+        grad_b = e * (1 + u) - (1 + e) * sig * u
+
+    ll_group = np.bincount(g, weights=w * ll, minlength=n_groups)
+    grad = np.column_stack([
+        np.bincount(g, weights=w * grad_a, minlength=n_groups),
+        np.bincount(g, weights=w * grad_b, minlength=n_groups),
+    ])
+    return ll_group, grad.ravel()
+
+
+def _fit_smooth(g, t, e, w, n_groups, model):
+    """
+    Weibull / Log-logistic 최대우도 추정 (모든 그룹을 한 번의 L-BFGS로)
+    - 관측치가 없는 그룹은 추정하지 않고 모수 / 로그우도를 NaN으로 반환
+    """
+    weights = np.bincount(g, weights=w, minlength=n_groups)
+    present = weights > 0
+    if not present.any():
+        return np.full((n_groups, 2), np.nan), np.full(n_groups, np.nan)
+
+    # 초기값: 그룹별 가중 평균 로그시간, shape=1 (빈 그룹은 그래디언트가 0이라 초기값 그대로 남음)
+    log_t_sum = np.bincount(g, weights=w * np.log(t), minlength=n_groups)
+    log_t_mean = np.divide(log_t_sum, weights, out=np.zeros(n_groups), where=present)
+    theta0 = np.column_stack([log_t_mean, np.zeros(n_groups)]).ravel()
+
+    def objective(theta):
+        ll_group, grad = _loglik(theta, g, t, e, w, n_groups, model)
+        return -ll_group.sum(), -grad
+
+    res = minimize(objective, theta0, jac=True, method="L-BFGS-B")
+    params = np.exp(res.x.reshape(n_groups, 2))
+    ll_group, _ = _loglik(res.x, g, t, e, w, n_groups, model)
+    params[~present] = np.nan
+    ll_group[~present] = np.nan
+    return params, ll_group
+
+
+def _fit_piecewise(g, t, e, w, n_groups, breaks):
+    """Piecewise exponential 최대우도 (구간별 이탈 수 / 노출시간, 닫힌 해)"""
+    lower = np.asarray(breaks, dtype=np.float64)
+    upper = np.append(lower[1:], np.inf)
+
+    exposure_cells = np.clip(t[:, None] - lower[None, :], 0, upper - lower)
+    # 구간은 (lower, upper] - 경계 시점의 이탈은 앞 구간에 귀속
+    interval = np.maximum(np.searchsorted(lower, t, side="left") - 1, 0)
+
+    n_intervals = len(lower)
+    exposure = np.zeros((n_groups, n_intervals))
+    np.add.at(exposure, g, w[:, None] * exposure_cells)
+    deaths = np.bincount(g * n_intervals + interval, weights=w * e,
+                         minlength=n_groups * n_intervals).reshape(n_groups, n_intervals)
+
+    hazards = np.divide(deaths, exposure, out=np.zeros_like(deaths), where=exposure > 0)
+
+    # 관측이 끝난 뒤 구간은 직전 구간 위험률로 채움
+    for k in range(1, n_intervals):
+        empty = exposure[:, k] == 0
+        hazards[empty, k] = hazards[empty, k - 1]
+
+    log_hazards = np.log(np.where(hazards > 0, hazards, 1.0))
+    ll_group = (deaths * log_hazards).sum(axis=1) - (hazards * exposure).sum(axis=1)
+
+    # 관측치가 없는 그룹은 위험률 0(영원히 생존)이 아니라 추정 불가(NaN)
+    present = np.bincount(g, weights=w, minlength=n_groups) > 0
+    hazards[~present] = np.nan
+    ll_group[~present] = np.nan
+    return hazards, ll_group
+
+
+def fit_parametric(durations, events, groups, model="weibull", labels=None, breaks=DEFAULT_BREAKS):
+    """
+    그룹별 모수 생존모형 적합 (데이터 지문 기반 캐시)
+    - durations: 생존기간 (일)
+    - model: 'weibull' | 'loglogistic' | 'piecewise'
+    - labels 중 관측치가 없는 그룹(필터 후 빈 그룹 등)은 params / loglik이 NaN
+    반환: {'model', 'labels', 'params', 'breaks', 'loglik', 'n_params'}
+    """
+    if model not in MODELS:
+        raise ValueError(f"지원하지 않는 모형: {model}")
+
+    durations = np.asarray(durations, dtype=np.float64)
+    events = np.asarray(events).astype(np.int64)
+    if labels is None:
+        labels, group_idx = np.unique(np.asarray(groups), return_inverse=True)
+    else:
+        labels = np.asarray(labels)
+        group_idx = pd.Categorical(groups, categories=labels).codes.astype(np.int64)
+        keep = group_idx >= 0
+        durations, events, group_idx = durations[keep], events[keep], group_idx[keep]
+
+    key = (model, tuple(breaks), tuple(labels), data_fingerprint(durations, events, group_idx))
+    with _FIT_CACHE_LOCK:
+        if key in _FIT_CACHE:
+            _FIT_CACHE.move_to_end(key)
+            return _FIT_CACHE[key]
+
+    g, t, e, w = _aggregate(durations, events, group_idx)
+    n_groups = len(labels)
+
+    if model == "piecewise":
+        params, ll_group = _fit_piecewise(g, t, e, w, n_groups, breaks)
+        n_params = len(breaks)
+    else:
+        params, ll_group = _fit_smooth(g, t, e, w, n_groups, model)
+        n_params = 2
+
+    fit = {
+        "model": model,
+        "labels": labels,
+        "params": params,
+        "breaks": np.asarray(breaks, dtype=np.float64),
+        "loglik": ll_group,
+        "n_params": n_params,
+    }
+
+    # 적합은 락 밖에서 수행 (같은 키가 동시에 적합되면 나중 결과로 덮어씀)
+    with _FIT_CACHE_LOCK:
+        _FIT_CACHE[key] = fit
+        _FIT_CACHE.move_to_end(key)
+        if len(_FIT_CACHE) > _FIT_CACHE_SIZE:
+            _FIT_CACHE.popitem(last=False)
+    return fit
+
+
+def _piecewise_cum_hazard(fit, t):
+    """Piecewise exponential 누적위험 (그룹 × 시점)"""
+    lower = fit["breaks"]
+    upper = np.append(lower[1:], np.inf)
+    exposure = np.clip(np.asarray(t, dtype=np.float64)[:, None] - lower[None, :], 0, upper - lower)
+    return fit["params"] @ exposure.T
+
+
+def predict_survival(fit, t):
+    """적합된 모형의 생존확률 (그룹 × 시점 배열)"""
+    t = np.asarray(t, dtype=np.float64)
+
+    if fit["model"] == "piecewise":
+        return np.exp(-_piecewise_cum_hazard(fit, t))
+
+    scale = fit["params"][:, [0]]
+    shape = fit["params"][:, [1]]
+    ratio = (t[None, :] / scale) ** shape
+    if fit["model"] == "weibull":
+        return np.exp(-ratio)
+    return 1.0 / (1.0 + ratio)
+
+
+def median_survival_time(fit):
+    """적합된 모형의 중위 생존기간 (일)"""
+    if fit["model"] == "weibull":
+        scale, shape = fit["params"][:, 0], fit["params"][:, 1]
+        return scale * np.log(2) ** (1 / shape)
+    if fit["model"] == "loglogistic":
+        return fit["params"][:, 0]
+
+    # piecewise: 누적위험이 ln2에 도달하는 구간에서 선형 역산
+    hazards = fit["params"]
+    lower = fit["breaks"]
+    widths = np.append(np.diff(lower), np.inf)
+    cum_at_lower = np.column_stack([
+        np.zeros(len(hazards)),
+        np.cumsum(hazards[:, :-1] * widths[:-1], axis=1),
+    ])
+
+    target = np.log(2)
+    medians = np.full(len(hazards), np.inf)
+    for i in range(len(hazards)):
+        if np.isnan(hazards[i]).any():
+            medians[i] = np.nan
+            continue
+        k = np.searchsorted(cum_at_lower[i], target, side="right") - 1
+        if hazards[i, k] > 0:
+            medians[i] = lower[k] + (target - cum_at_lower[i, k]) / hazards[i, k]
+    return medians
+
+
+def mean_survival_time(fit, horizon=np.inf, n_points=4000):
+    """
+    적합된 모형의 AUC (평균 생존기간, 일)
+    - horizon=inf: 평생 AUC (닫힌 해, 정의되지 않으면 inf)
+    - horizon 지정: 0 ~ horizon 수치적분
+    """
+    if np.isfinite(horizon):
+        grid = np.linspace(0, horizon, n_points)
+        return trapezoid(predict_survival(fit, grid), grid, axis=1)
+
+    if fit["model"] == "weibull":
+        scale, shape = fit["params"][:, 0], fit["params"][:, 1]
+        return scale * gamma(1 + 1 / shape)
+
+    if fit["model"] == "loglogistic":
+        scale, shape = fit["params"][:, 0], fit["params"][:, 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = scale * (np.pi / shape) / np.sin(np.pi / shape)
+        return np.where(shape > 1, mean, np.where(np.isnan(shape), np.nan, np.inf))
+
+    # piecewise: 구간별 지수분포 적분의 합
+    hazards = fit["params"]
+    lower = fit["breaks"]
+    widths = np.append(np.diff(lower), np.inf)
+    cum_at_lower = np.column_stack([
+        np.zeros(len(hazards)),
+        np.cumsum(hazards[:, :-1] * widths[:-1], axis=1),
+    ])
+    s_lower = np.exp(-cum_at_lower)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pieces = np.where(
+            hazards > 0,
+            s_lower * (1 - np.exp(-hazards * widths)) / hazards,
+            s_lower * widths,
+        )
+    return pieces.sum(axis=1)
+
+
+def extrapolation_table(df, group_col="결제개월수", labels=None, model="weibull",
+                        unit_days=30.44, horizon=None, duration_col="duration_days", event_col="이탈여부"):
+    """
+    그룹별 외삽 결과 표
+    - unit_days: 표시 단위 1단위의 일수 (개월=30.44, 주=7)
+    - horizon: AUC 적분 상한 (표시 단위, None이면 평생 AUC)
+    """
+    fit = fit_parametric(df[duration_col], df[event_col], df[group_col], model=model, labels=labels)
+
+    horizon_days = np.inf if horizon is None else horizon * unit_days
+    aic = 2 * fit["n_params"] - 2 * fit["loglik"]
+
+    return fit, pd.DataFrame({
+        "구분": fit["labels"],
+        "모형": MODELS[model],
+        "외삽 중위생존기간": median_survival_time(fit) / unit_days,
+        "외삽 AUC": mean_survival_time(fit, horizon=horizon_days) / unit_days,
+        "AIC": aic,
+    })
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# 단계 코드 → 퍼널 단계명 (이탈 시점의 단계)
+STAGE_COLUMNS = {1: '결제', 2: '과외신청서', 3: '매칭직후첫수업전'}
+
+FUNNEL_COLUMNS = [
+    '결제', '과외신청서', '결제직후매칭전', '매칭직후첫수업전',
+    '첫수업후2회차수업전', '첫수업후DM1이하', '2회차수업후DM1이하', '매칭직후DM1이하'
+]
+
+
+def assign_funnel_bucket(df_processed: pd.DataFrame) -> pd.DataFrame:
+    """
+    이탈 수업마다 퍼널 버킷을 한 번만 지정 (이탈하지 않았거나 해당 없음은 빈 문자열)
+    - 단계 1/2/3 이탈 → 결제 / 과외신청서 / 매칭직후첫수업전
+    - 0 < donemonth_raw <= 0.25 이고 cycle_count == 2 → 첫수업후2회차수업전
+    - 나머지 0 < donemonth_raw <= 1 → 2회차수업후DM1이하
+    (단계 버킷과 DM 버킷은 노트북 정의처럼 서로 독립적으로 집계되므로 별도 컬럼으로 반환)
+    """
+    churned = df_processed['이탈여부'] == 1
+    stage = df_processed['단계']
+    dm = df_processed['donemonth_raw']
+
+    stage_bucket = pd.Series(
+        np.select(
+            [churned & (stage == code) for code in STAGE_COLUMNS],
+            list(STAGE_COLUMNS.values()),
+            default=''
+        ),
+        index=df_processed.index
+    )
+
+    in_dm1 = churned & (dm > 0) & (dm <= 1)
+    before_second = in_dm1 & (dm <= 0.25) & (df_processed['cycle_count'] == 2)
+    dm_bucket = pd.Series(
+        np.select([before_second, in_dm1], ['첫수업후2회차수업전', '2회차수업후DM1이하'], default=''),
+        index=df_processed.index
+    )
+
+    return pd.DataFrame({'단계버킷': stage_bucket, 'DM버킷': dm_bucket})
+
+
+def calculate_churn_funnel(df_processed: pd.DataFrame) -> pd.DataFrame:
+    """
+    월 × 퍼널 단계 이탈률(%) 표 (노트북 calculate_churn_rate_by_donemonth 반복 호출 대체)
+    1. 각 수업의 결제 월과 퍼널 버킷을 한 번만 계산
+    2. 월 × 버킷 crosstab 한 번으로 이탈 수 집계
+    3. 월별 신규 수업 수로 나눠 이탈률 계산 후 누적 단계 컬럼 합성
+    """
+    month = df_processed['결제등록일'].dt.to_period('M')
+    buckets = assign_funnel_bucket(df_processed)
+
+    new_counts = month.value_counts().sort_index()
+
+    stage_counts = pd.crosstab(month, buckets['단계버킷'])
+    dm_counts = pd.crosstab(month, buckets['DM버킷'])
+    counts = (
+        pd.concat([stage_counts, dm_counts], axis=1)
+        .drop(columns='', errors='ignore')
+        .reindex(
+            index=new_counts.index,
+            columns=[*STAGE_COLUMNS.values(), '첫수업후2회차수업전', '2회차수업후DM1이하'],
+            fill_value=0
+        )
+    )
+
+    rates = counts.div(new_counts, axis=0) * 100
+
+    result_df = pd.DataFrame(index=new_counts.index)
+    result_df['신규수업수'] = new_counts
+    result_df['결제'] = rates['결제']
+    result_df['과외신청서'] = rates['과외신청서']
+    result_df['결제직후매칭전'] = result_df['결제'] + result_df['과외신청서']
+    result_df['매칭직후첫수업전'] = rates['매칭직후첫수업전']
+    result_df['첫수업후2회차수업전'] = rates['첫수업후2회차수업전']
+    result_df['첫수업후DM1이하'] = rates['첫수업후2회차수업전'] + rates['2회차수업후DM1이하']
+    result_df['2회차수업후DM1이하'] = result_df['첫수업후DM1이하'] - result_df['첫수업후2회차수업전']
+    result_df['매칭직후DM1이하'] = (
+        result_df['매칭직후첫수업전'] + result_df['첫수업후2회차수업전'] + result_df['2회차수업후DM1이하']
+    )
+
+    result_df.index = result_df.index.astype(str)
+    result_df.index.name = '연-월'
+    return result_df.reset_index()
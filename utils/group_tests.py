@@ -0,0 +1,149 @@
+import time
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+
+
+def build_event_table(durations, events, groups, labels=None):
+    """
+    전체 그룹을 합친 이벤트 시점 표 생성 (한 번의 정렬/집계)
+    - d[j, g]: 시점 j에 그룹 g에서 발생한 이탈 수
+    - n[j, g]: 시점 j 직전 그룹 g의 위험집합 크기
+    - 이탈이 한 건 이상 발생한 시점만 남김
+    """
+    durations = np.asarray(durations, dtype=np.float64)
+    events = np.asarray(events).astype(np.int64)
+    groups = np.asarray(groups)
+
+    if labels is None:
+        labels, group_idx = np.unique(groups, return_inverse=True)
+    else:
+        # labels에 없는 그룹은 -1 코드 → 제외
+        labels = np.asarray(labels)
+        group_idx = pd.Categorical(groups, categories=labels).codes.astype(np.int64)
+        keep = group_idx >= 0
+        durations, events, group_idx = durations[keep], events[keep], group_idx[keep]
+
+    n_groups = len(labels)
+    times, time_idx = np.unique(durations, return_inverse=True)
+    cell = time_idx * n_groups + group_idx
+
+    size = len(times) * n_groups
+    d = np.bincount(cell, weights=events, minlength=size).reshape(len(times), n_groups)
+    total = np.bincount(cell, minlength=size).reshape(len(times), n_groups)
+
+    # 위험집합: 해당 시점 이후(포함) 관측치 수 = 역방향 누적합
+    n = np.cumsum(total[::-1], axis=0)[::-1]
+
+    has_event = d.sum(axis=1) > 0
+    return {
+        "times": times[has_event],
+        "d": d[has_event],
+        "n": n[has_event].astype(np.float64),
+        "labels": labels,
+    }
+
+
+def _weights(n_total, weighting):
+    """시점별 가중치 (logrank=1, wilcoxon=위험집합 크기)"""
+    if weighting == "logrank":
+        return np.ones_like(n_total)
+    if weighting == "wilcoxon":
+        return n_total
+    raise ValueError(f"지원하지 않는 가중치: {weighting}")
+
+
+def multigroup_test(table, weighting="logrank"):
+    """다집단 로그순위(또는 Wilcoxon) 검정 - 자유도 G-1 카이제곱"""
+    d, n = table["d"], table["n"]
+    d_total = d.sum(axis=1)
+    n_total = n.sum(axis=1)
+    w = _weights(n_total, weighting)
+
+    share = n / n_total[:, None]
+    observed_minus_expected = (w[:, None] * (d - share * d_total[:, None])).sum(axis=0)
+
+    # 초기하분포 분산 (n_j = 1 인 시점은 분산 0)
+    ties = np.divide(n_total - d_total, n_total - 1, out=np.zeros_like(n_total), where=n_total > 1)
+    scale = w ** 2 * d_total * ties
+    cov = np.einsum("j,jg,jh->gh", scale, share, -share)
+    cov[np.diag_indices_from(cov)] += (scale[:, None] * share).sum(axis=0)
+
+    # 마지막 그룹을 제외한 (G-1)차원으로 검정
+    u = observed_minus_expected[:-1]
+    stat = float(u @ np.linalg.pinv(cov[:-1, :-1]) @ u)
+    dof = len(table["labels"]) - 1
+    return {"검정통계량": stat, "자유도": dof, "p값": float(chi2.sf(stat, dof))}
+
+
+def pairwise_tests(table, weighting="logrank"):
+    """모든 그룹 쌍의 로그순위(또는 Wilcoxon) 검정을 같은 이벤트 표에서 한 번에 계산"""
+    labels = table["labels"]
+    pairs = np.array(list(combinations(range(len(labels)), 2)), dtype=int).reshape(-1, 2)
+    a, b = pairs[:, 0], pairs[:, 1]
+
+    d, n = table["d"], table["n"]
+    d_a, d_b, n_a, n_b = d[:, a], d[:, b], n[:, a], n[:, b]
+    d_pair = d_a + d_b
+    n_pair = n_a + n_b
+    w = _weights(n_pair, weighting)
+
+    share_a = np.divide(n_a, n_pair, out=np.zeros_like(n_a), where=n_pair > 0)
+    u = (w * (d_a - share_a * d_pair)).sum(axis=0)
+
+    ties = np.divide(n_pair - d_pair, n_pair - 1, out=np.zeros_like(n_pair), where=n_pair > 1)
+    var = (w ** 2 * d_pair * ties * share_a * (1 - share_a)).sum(axis=0)
+
+    stat = np.divide(u ** 2, var, out=np.zeros_like(u), where=var > 0)
+    return pd.DataFrame({
+        "그룹1": labels[a],
+        "그룹2": labels[b],
+        "검정통계량": stat,
+        "p값": chi2.sf(stat, 1),
+    })
+
+
+def compare_groups(df, group_col, duration_col="duration_days", event_col="이탈여부",
+                   labels=None, weighting="logrank"):
+    """그룹 간 생존곡선 차이 검정 (다집단 + 쌍별)"""
+    table = build_event_table(df[duration_col], df[event_col], df[group_col], labels=labels)
+    return multigroup_test(table, weighting), pairwise_tests(table, weighting)
+
+
+def format_p_value(p):
+    """p값 표시 형식"""
+    return "<0.001" if p < 0.001 else f"{p:.3f}"
+
+
+def benchmark_group_tests(n_rows=1_000_000, seed=0):
+    """
+    이벤트 표 기반 검정과 lifelines 쌍별 logrank_test 반복 호출의 소요시간 비교
+    """
+    from lifelines.statistics import logrank_test, multivariate_logrank_test
+    from utils.synthetic import make_processed_sheet
+
+    df = make_processed_sheet(n_rows, seed=seed)
+    labels = np.array(["1", "3", "6", "12"])
+
+    start = time.perf_counter()
+    compare_groups(df, "결제개월수", labels=labels)
+    compare_groups(df, "결제개월수", labels=labels, weighting="wilcoxon")
+    elapsed_table = time.perf_counter() - start
+
+    start = time.perf_counter()
+    multivariate_logrank_test(df["duration_days"], df["결제개월수"], df["이탈여부"])
+    for g1, g2 in combinations(labels, 2):
+        x = df[df["결제개월수"] == g1]
+        y = df[df["결제개월수"] == g2]
+        logrank_test(x["duration_days"], y["duration_days"], x["이탈여부"], y["이탈여부"])
+        logrank_test(x["duration_days"], y["duration_days"], x["이탈여부"], y["이탈여부"],
+                     weightings="wilcoxon")
+    elapsed_lifelines = time.perf_counter() - start
+
+    return pd.DataFrame({
+        "방식": ["이벤트 표 (logrank + wilcoxon)", "lifelines 쌍별 호출"],
+        "행 수": [n_rows, n_rows],
+        "소요시간(초)": [elapsed_table, elapsed_lifelines],
+    })
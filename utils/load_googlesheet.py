@@ -6,11 +6,12 @@ from datetime import datetime, timedelta
 import json
 import streamlit as st
 
-@st.cache_data
-def load_google_sheets_data(worksheet_name: str):
-    print(f"[{datetime.now()}] Google Sheet 데이터 로드")
-    """Google Sheets에서 데이터 로드 - 중복 헤더 오류 해결"""
-    
+from utils.periods import month_codes, week_codes
+from utils.progressive import PREVIEW_SAMPLE_SIZE, approximate_analysis
+from utils.refresher import SnapshotRefresher
+
+def open_worksheet(worksheet_name: str):
+    """서비스 계정으로 KPI 스프레드시트의 워크시트 열기"""
     with open('pj_appscript.json', 'r') as f:
         credentials_info = json.load(f)
 
@@ -23,8 +24,11 @@ def load_google_sheets_data(worksheet_name: str):
 
     # 스프레드시트 열기
     spreadsheet = client.open("🔥🔥🔥 경험그룹_KPI (수업 기준!!!!!) 🔥🔥🔥")
-    worksheet = spreadsheet.worksheet(worksheet_name)
+    return spreadsheet.worksheet(worksheet_name)
 
+
+def worksheet_to_dataframe(worksheet) -> pd.DataFrame:
+    """워크시트(get_all_values 지원 객체) → DataFrame 변환 - 중복 헤더 오류 해결"""
     try:
         # 모든 데이터 가져오기
         all_values = worksheet.get_all_values()
@@ -68,6 +72,40 @@ def load_google_sheets_data(worksheet_name: str):
         return pd.DataFrame()
 
 
+def fetch_google_sheets_data(worksheet_name: str) -> pd.DataFrame:
+    """Google Sheets에서 데이터 로드 (캐시 없음 - 백그라운드 갱신용)"""
+    print(f"[{datetime.now()}] Google Sheet 데이터 로드")
+    return worksheet_to_dataframe(open_worksheet(worksheet_name))
+
+
+@st.cache_data
+def load_google_sheets_data(worksheet_name: str):
+    """Google Sheets에서 데이터 로드 - 중복 헤더 오류 해결"""
+    return fetch_google_sheets_data(worksheet_name)
+
+
+@st.cache_resource
+def get_sheet_refresher(worksheet_name: str, interval: int = 600, preview_size: int = PREVIEW_SAMPLE_SIZE):
+    """
+    프로세스 전체에서 공유하는 백그라운드 갱신기
+    - 마지막 정상 처리 결과를 즉시 제공하고 interval초마다 시트를 다시 읽어 교체
+    - 스냅샷은 모든 세션이 공유하는 DataFrame (세션에서는 session_view로만 사용, 직접 수정 금지)
+    - preview_size: 첫 적재 때 먼저 보여줄 층화 표본 근사 결과의 표본 크기 (0이면 근사 단계 없음)
+    """
+    preview = None
+    if preview_size:
+        preview = lambda raw: approximate_analysis(raw, processing_google_sheet, sample_size=preview_size)
+
+    refresher = SnapshotRefresher(
+        fetch=lambda: fetch_google_sheets_data(worksheet_name),
+        process=processing_google_sheet,
+        interval=interval,
+        preview=preview
+    )
+    refresher.start()
+    return refresher
+
+
 def processing_google_sheet(df: pd.DataFrame) -> pd.DataFrame:
     """
     Google Sheet → Pandas 데이터 전처리 함수
@@ -75,6 +113,7 @@ def processing_google_sheet(df: pd.DataFrame) -> pd.DataFrame:
     2. dtype 보정 (infer_objects)
     3. 주요 컬럼 타입 변환 (날짜, 숫자, 카테고리 등)
     4. 최종 분석용 컬럼만 선택
+    - 사용하는 컬럼만 하나씩 변환해 원본 크기의 중간 DataFrame(마스킹 복사본, 행 필터 복사본)을 만들지 않음
     """
 
     def donemonth_to_days_bucketed(series: pd.Series) -> pd.Series:
@@ -108,60 +147,67 @@ def processing_google_sheet(df: pd.DataFrame) -> pd.DataFrame:
     
     weight_map = {'W1': 0.25, 'W2': 0.125, 'W3': 0.0833}
 
-    def correct_done_month(df):
-        df['opt_prefix'] = df['option'].str.extract(r'^(W\d)')
-        df['opt_weight'] = df['opt_prefix'].map(weight_map)
-
-        cond = (df['donemonth'] == 0) & df['opt_weight'].notna()
-        df.loc[cond, 'donemonth'] = df.loc[cond, 'cycle_count'] * df.loc[cond, 'opt_weight']
-
-        return df
+    def correct_done_month(donemonth, option, cycle_count):
+        """donemonth == 0 이고 옵션이 W1~W3이면 cycle_count × 주당 가중치로 보정 (옵션 접두어는 컬럼으로 남기지 않음)"""
+        opt_weight = option.str[:2].map(weight_map)
+        cond = (donemonth == 0) & opt_weight.notna()
+        return donemonth.mask(cond, cycle_count * opt_weight)
 
     print(f"[{datetime.now()}] 전처리 시작")
 
-    # 1. 데이터 복사
-    df = df.copy()
-
-    # 2. 컬럼별로 빈 문자열 → NaN 치환
-    df = df.mask(df == '', np.nan)
+    # 1. 'T' 값 제거 (테스트 데이터 제외) - 원본 전체가 아니라 사용하는 컬럼만 행 필터 복사
+    keep_rows = (df['이탈여부'] != 'T').to_numpy()
+    index = df.index[keep_rows]
 
-    # 3. dtype 보정 (FutureWarning 방지)
-    df = df.infer_objects(copy=False)
+    def column(name):
+        """2~3. 빈 문자열 → NaN 치환 + dtype 보정 (컬럼 단위 + 필터된 배열 제자리 치환이라 중간 복사본이 생기지 않음)"""
+        values = df[name].to_numpy()[keep_rows]
+        if values.dtype == object:
+            values[values == ''] = np.nan
+        return pd.Series(values, index=index, name=name).infer_objects(copy=False)
 
-    # 4. 'T' 값 제거 (테스트 데이터 제외)
-    df = df[df['이탈여부'] != 'T']
+    # 5. 타입 변환 (결과 컬럼만 모아 마지막에 한 번에 DataFrame 구성)
+    out = {}
 
-    # 5. 타입 변환
     # 날짜형
-    df['결제등록일'] = pd.to_datetime(df['payment_regdate'], errors='coerce')
-    if '중단예정일' in df.columns:
-        df['중단예정일'] = pd.to_datetime(df['중단예정일'], errors='coerce')
+    out['결제등록일'] = pd.to_datetime(column('payment_regdate'), errors='coerce')
 
     # 숫자형 (nullable Int64 사용)
-    df['lvt'] = pd.to_numeric(df['lvt'], errors='coerce').astype('Int64')
-    df['user_No'] = pd.to_numeric(df['user_No'], errors='coerce').astype('Int64')
-    df['단계'] = pd.to_numeric(df['단계'], errors='coerce').fillna(0).astype(int)
-    # 1. 원본 donemonth 보존
-    df['donemonth'] = pd.to_numeric(df['done_month'], errors='coerce')
-    df['donemonth_raw'] = pd.to_numeric(df['done_month'], errors='coerce')
-    df['stage_count'] = pd.to_numeric(df['stage_count'], errors='coerce').fillna(0).astype(int)
-    df['cycle_count'] = pd.to_numeric(df['cycle_count'], errors='coerce').fillna(0).astype(int)
-    if '중단 예정 DONEMONTH' in df.columns:
-        df['중단 예정 DONEMONTH'] = pd.to_numeric(df['중단 예정 DONEMONTH'], errors='coerce')
+    out['lvt'] = pd.to_numeric(column('lvt'), errors='coerce').astype('Int64')
+    out['user_No'] = pd.to_numeric(column('user_No'), errors='coerce').astype('Int64')
+    out['option'] = column('option')
+    out['단계'] = pd.to_numeric(column('단계'), errors='coerce').fillna(0).astype(int)
 
     # 카테고리형 (이탈여부: A=0, P=1)
-    df['이탈여부'] = df['이탈여부'].map({"A": 0, "P": 1})
-    df = correct_done_month(df)
-    df['duration_days'] = donemonth_to_days_bucketed(df['donemonth'])
-    df['결제개월수'] = df['최초 개월 수']
-
-    # 6. 최종 사용할 컬럼만 선택 (존재하는 것만 유지)
-    keep_cols = [
-        '결제등록일', 'lvt', 'user_No', 'option', '단계', '이탈여부', 'donemonth_raw','donemonth', 'duration_days',
-        '학년', '교과/탐구', '결제개월수', 'stage_count', 'cycle_count',
-        '과외상태', '수업상태', '중단예정일', '중단 예정 DONEMONTH'
-    ]
-    df = df[keep_cols]
+    out['이탈여부'] = column('이탈여부').map({"A": 0, "P": 1})
+
+    # 원본 donemonth 보존 (파싱은 한 번, 보정값은 별도 배열)
+    cycle_count = pd.to_numeric(column('cycle_count'), errors='coerce').fillna(0).astype(int)
+    out['donemonth_raw'] = pd.to_numeric(column('done_month'), errors='coerce')
+    out['donemonth'] = correct_done_month(out['donemonth_raw'], out['option'], cycle_count)
+    out['duration_days'] = donemonth_to_days_bucketed(out['donemonth'])
+
+    out['학년'] = column('학년')
+    out['교과/탐구'] = column('교과/탐구')
+    out['결제개월수'] = column('최초 개월 수')
+    out['stage_count'] = pd.to_numeric(column('stage_count'), errors='coerce').fillna(0).astype(int)
+    out['cycle_count'] = cycle_count
+
+    # 6. 최종 사용할 컬럼만 구성 (존재하는 것만 유지)
+    for name in ['과외상태', '수업상태']:
+        if name in df.columns:
+            out[name] = column(name)
+    if '중단예정일' in df.columns:
+        out['중단예정일'] = pd.to_datetime(column('중단예정일'), errors='coerce')
+    if '중단 예정 DONEMONTH' in df.columns:
+        out['중단 예정 DONEMONTH'] = pd.to_numeric(column('중단 예정 DONEMONTH'), errors='coerce')
+
+    # 기간 코드 (차트 집계용 정수 키, 적재 시 한 번만 계산)
+    out['결제월코드'] = month_codes(out['결제등록일'])
+    out['결제주코드'] = week_codes(out['결제등록일'])
+
+    # 컬럼 배열을 그대로 사용 (블록 통합 복사 없음)
+    df = pd.DataFrame(out, copy=False)
 
     print(f"[{datetime.now()}] 전처리 완료: shape={df.shape}")
     return df
\ No newline at end of file
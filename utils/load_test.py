@@ -0,0 +1,123 @@
+"""
+생존분석 API 부하 테스트 (p50 / p99 지연시간)
+
+실행:
+    python -m utils.load_test --url http://127.0.0.1:8502 --requests 2000 --concurrency 16
+    python -m utils.load_test --self-host --synthetic 200000     # 서버를 같은 프로세스에서 띄워 측정
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+# (이름, 메서드, 경로, 본문) - 대시보드/다른 도구의 대표 조회 패턴
+DEFAULT_SCENARIOS = [
+    ("summary", "GET", "/summary?unit=" + quote("개월") + "&horizon=36", None),
+    ("summary_week", "GET", "/summary?unit=" + quote("주") + "&horizon=156", None),
+    ("curve", "GET", "/curve?group=3&unit=" + quote("주") + "&horizon=52", None),
+    ("segments", "POST", "/segments", {
+        "segments": [{"학년": g, "결제개월수": m} for g in ["고1", "고2", "고3", "N수생"] for m in ["1", "3", "6"]],
+        "unit": "개월",
+        "horizon": 36,
+    }),
+]
+
+
+def _request(base_url, method, path, body, etag=None):
+    data = None if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+    req = urllib.request.Request(base_url + path, data=data, method=method)
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    if etag is not None:
+        req.add_header("If-None-Match", etag)
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            status, new_etag = resp.status, resp.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        status, new_etag = e.code, e.headers.get("ETag")
+    return time.perf_counter() - start, status, new_etag
+
+
+def run_load_test(base_url, n_requests=1000, concurrency=8, scenarios=DEFAULT_SCENARIOS, use_etag=False):
+    """
+    시나리오별 n_requests건을 concurrency개 스레드로 요청
+    - use_etag: 직전 ETag로 If-None-Match 요청 (304 재검증 경로 측정)
+    반환: 시나리오별 p50 / p99 / 평균(ms), 처리량(req/s), 상태 코드 분포
+    """
+    rows = []
+    for name, method, path, body in scenarios:
+        # 첫 요청은 캐시 미스 (별도 기록)
+        cold, _, etag = _request(base_url, method, path, body)
+        local = threading.local()
+
+        def one(_):
+            tag = getattr(local, "etag", etag) if use_etag else None
+            elapsed, status, new_etag = _request(base_url, method, path, body, tag)
+            if new_etag is not None:
+                local.etag = new_etag
+            return elapsed, status
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(n_requests)))
+        wall = time.perf_counter() - start
+
+        latencies = np.array([r[0] for r in results]) * 1000
+        statuses = pd.Series([r[1] for r in results]).value_counts().to_dict()
+        rows.append({
+            "시나리오": name + (" (ETag)" if use_etag else ""),
+            "요청 수": n_requests,
+            "첫 요청(ms)": cold * 1000,
+            "p50(ms)": np.percentile(latencies, 50),
+            "p99(ms)": np.percentile(latencies, 99),
+            "평균(ms)": latencies.mean(),
+            "처리량(req/s)": n_requests / wall,
+            "상태 코드": statuses,
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="생존분석 API 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:8502")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--etag", action="store_true", help="If-None-Match 재검증 경로도 측정")
+    parser.add_argument("--self-host", action="store_true", help="합성 데이터 서버를 같은 프로세스에서 실행")
+    parser.add_argument("--synthetic", type=int, default=200_000)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if args.self_host:
+        from utils.api import create_server
+        from utils.refresher import SnapshotRefresher
+        from utils.synthetic import make_processed_sheet
+
+        refresher = SnapshotRefresher(fetch=lambda: make_processed_sheet(args.synthetic)).start()
+        server = create_server(refresher, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        pd.set_option("display.width", 200)
+        print(run_load_test(base_url, args.requests, args.concurrency).round(2).to_string(index=False))
+        if args.etag:
+            print(run_load_test(base_url, args.requests, args.concurrency, use_etag=True).round(2).to_string(index=False))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
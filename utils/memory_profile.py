@@ -0,0 +1,254 @@
+"""
+전처리 체인 메모리 프로파일러 + 메모리 예산 검사
+
+실행:
+    python -m utils.memory_profile                      # 단계별 / 줄별 메모리 표
+    python -m utils.memory_profile --check               # 예산 초과 시 종료 코드 1 (CI / 배포 전 검사)
+    python -m utils.memory_profile --sizes 100000 500000 --lines
+    python -m pytest -q tests/test_memory_budget.py   # 같은 예산 검사 (작은 크기, pytest)
+
+- 최대 RSS: 단계 실행 중 /proc/self/statm을 주기적으로 읽어 기록 (프로세스 전체 기준, 단계 시작 시점 대비 증가분)
+- tracemalloc: 단계별 최대 / 잔류 할당량, 대상 함수는 줄 단위 구간 최대 할당량
+- 예산은 입력 행당 바이트로 정의해 데이터 크기와 무관하게 비교
+"""
+import argparse
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+# 단계별 tracemalloc 최대 할당량 예산 (입력 행당 바이트)
+# - 현재 구현 측정값(약 205 / 115 B/행)의 약 1.3배: 원본 크기 중간 복사본이 하나만 다시 생겨도 초과
+# - 이전 구현: processing_google_sheet 약 340, process_data 약 285 B/행
+MEMORY_BUDGETS = {
+    "processing_google_sheet": 270,
+    "process_data": 150,
+}
+
+DEFAULT_SIZES = (50_000, 200_000, 500_000)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes():
+    """현재 프로세스 RSS (리눅스 /proc 기준, 없으면 ru_maxrss로 대체)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RSSSampler:
+    """
+    구간 실행 중 RSS 최대값 샘플링 (별도 스레드, interval초 간격)
+    with RSSSampler() as s: ...  →  s.peak, s.baseline
+    """
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.baseline = self.peak = rss_bytes()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+        return False
+
+
+def measure(func, *args, **kwargs):
+    """
+    함수 실행의 메모리 사용량 (입력을 변경하지 않는 함수 대상)
+    - RSS / 소요시간은 tracemalloc 없이 한 번, 할당량은 tracemalloc으로 한 번 더 실행 (추적 오버헤드 분리)
+    반환: (결과, dict(최대 RSS 증가, tracemalloc 최대 / 잔류, 소요시간))
+    """
+    gc.collect()
+    start = time.perf_counter()
+    with RSSSampler() as sampler:
+        result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args, **kwargs)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        "최대 RSS 증가(MB)": (sampler.peak - sampler.baseline) / 1024 ** 2,
+        "할당 최대(MB)": peak / 1024 ** 2,
+        "잔류(MB)": current / 1024 ** 2,
+        "소요시간(초)": elapsed,
+    }
+
+
+def line_profile(func, *args, **kwargs):
+    """
+    대상 함수 본문의 줄별 메모리 (sys.settrace 줄 이벤트마다 tracemalloc 현재값 / 구간 최대값 기록)
+    - 중첩 함수 호출 안의 할당은 호출한 줄에 합산
+    반환: (결과, DataFrame(줄, 코드, 실행 후(MB), 증가(MB), 구간 최대(MB)))
+    """
+    import linecache
+
+    code = func.__code__
+    records = []
+    state = {"line": None}
+
+    def flush(lineno):
+        current, peak = tracemalloc.get_traced_memory()
+        if state["line"] is not None:
+            records.append((state["line"], current, peak))
+        state["line"] = lineno
+        tracemalloc.reset_peak()
+
+    def local_trace(frame, event, arg):
+        if event == "line":
+            flush(frame.f_lineno)
+        elif event == "return":
+            flush(None)
+        return local_trace
+
+    def global_trace(frame, event, arg):
+        return local_trace if frame.f_code is code else None
+
+    gc.collect()
+    tracemalloc.start()
+    previous = sys.gettrace()
+    sys.settrace(global_trace)
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        sys.settrace(previous)
+        tracemalloc.stop()
+
+    rows = []
+    prev_current = 0
+    for lineno, current, peak in records:
+        rows.append({
+            "줄": lineno,
+            "코드": linecache.getline(code.co_filename, lineno).strip()[:80],
+            "실행 후(MB)": current / 1024 ** 2,
+            "증가(MB)": (current - prev_current) / 1024 ** 2,
+            "구간 최대(MB)": peak / 1024 ** 2,
+        })
+        prev_current = current
+
+    # 반복 실행된 줄은 최대값 기준으로 합침
+    table = pd.DataFrame(rows)
+    if len(table):
+        table = table.groupby(["줄", "코드"], as_index=False, sort=True).agg({
+            "실행 후(MB)": "max", "증가(MB)": "sum", "구간 최대(MB)": "max"
+        })
+    return result, table
+
+
+def _pipeline_steps(n_rows, seed=0):
+    """
+    전처리 체인 단계 목록 [(단계명, 함수, 인자 생성 함수)]
+    - 구글시트 경로: 원본 시트 → processing_google_sheet
+    - CSV 업로드 경로: load_data 결과 → process_data (기간 전체, 기준일 30일 전)
+    """
+    from utils.data_processing import process_data, reference_dates
+    from utils.load_googlesheet import processing_google_sheet
+    from utils.synthetic import make_raw_sheet, make_source_frame
+
+    def sheet_args():
+        return (make_raw_sheet(n_rows, seed=seed),)
+
+    def upload_args():
+        df = make_source_frame(n_rows, seed=seed)
+        return (df, df['crda'].min(), *reference_dates(df))
+
+    return [
+        ("processing_google_sheet", processing_google_sheet, sheet_args),
+        ("process_data", process_data, upload_args),
+    ]
+
+
+def profile_pipeline(sizes=DEFAULT_SIZES, seed=0):
+    """
+    데이터 크기별 × 단계별 최대 RSS 증가 / tracemalloc 최대·잔류 / 행당 최대 바이트
+    - 대시보드(mainv2)와 같은 Copy-on-Write 설정에서 측정 (이 함수 안에서만 적용)
+    """
+    rows = []
+    for n_rows in sizes:
+        for name, func, make_args in _pipeline_steps(n_rows, seed=seed):
+            args = make_args()
+            input_mb = args[0].memory_usage(index=True, deep=True).sum() / 1024 ** 2
+            with pd.option_context("mode.copy_on_write", True):
+                result, stats = measure(func, *args)
+            rows.append({
+                "행 수": n_rows,
+                "단계": name,
+                "입력(MB)": input_mb,
+                **stats,
+                "행당 최대(B)": stats["할당 최대(MB)"] * 1024 ** 2 / n_rows,
+            })
+            del args, result
+    return pd.DataFrame(rows)
+
+
+def profile_lines(n_rows=200_000, seed=0):
+    """단계 함수별 줄 단위 메모리 표 {단계명: DataFrame}"""
+    tables = {}
+    for name, func, make_args in _pipeline_steps(n_rows, seed=seed):
+        args = make_args()
+        with pd.option_context("mode.copy_on_write", True):
+            _, tables[name] = line_profile(func, *args)
+    return tables
+
+
+def check_memory_budget(sizes=DEFAULT_SIZES, budgets=MEMORY_BUDGETS, seed=0):
+    """
+    단계별 행당 최대 할당량이 예산 이하인지 검사
+    반환: (통과 여부, 측정 표 + 예산 / 통과 컬럼)
+    """
+    result = profile_pipeline(sizes, seed=seed)
+    result["예산(B/행)"] = result["단계"].map(budgets)
+    result["통과"] = result["예산(B/행)"].isna() | (result["행당 최대(B)"] <= result["예산(B/행)"])
+    return bool(result["통과"].all()), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전처리 체인 메모리 프로파일러")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--check", action="store_true", help="메모리 예산 초과 시 종료 코드 1")
+    parser.add_argument("--lines", action="store_true", help="줄 단위 메모리 표 출력 (가장 큰 크기 기준)")
+    args = parser.parse_args()
+
+    pd.set_option("display.width", 200)
+    passed, result = check_memory_budget(args.sizes)
+    print(result.round(2).to_string(index=False))
+
+    if args.lines:
+        for name, table in profile_lines(max(args.sizes)).items():
+            print(f"\n[{name}] 줄 단위 메모리 ({max(args.sizes):,}행)")
+            print(table.round(2).to_string(index=False))
+
+    if args.check:
+        print("\n메모리 예산 " + ("통과" if passed else "초과"))
+        sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
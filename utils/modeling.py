@@ -1,43 +1,68 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from lifelines import KaplanMeierFitter
 import plotly.graph_objects as go
+from scipy.integrate import trapezoid
+
+from utils.kernels import grouped_product_limit, rmst
+from utils.periods import month_codes, month_labels, period_counts
+from utils.survival import PAY_MONTH_GROUPS, kaplan_meier, median_survival
+
+FST_MONTHS_GROUPS = [1, 3, 6, 12]
+
+def _survival_frame(timeline, survival, max_month=36):
+    """KM 결과 → 0 ~ max_month 생존곡선 데이터프레임 (lifelines survival_function_ 형식)"""
+    survival_df = pd.DataFrame({"개월": timeline, "생존확률": survival})
+    return survival_df[(survival_df["개월"] <= max_month) & (survival_df["개월"] >= 0)]
+
+def _fit_fst_month_groups(processed_df):
+    """fst_months 그룹별 KM (한 번의 정렬/집계, 0 시점 추가는 kaplan_meier와 동일)"""
+    codes = pd.Categorical(processed_df['fst_months'], categories=FST_MONTHS_GROUPS).codes
+    fits = grouped_product_limit(
+        codes, processed_df["done_month_corrected"], processed_df["churn"], n_groups=len(FST_MONTHS_GROUPS)
+    )
+
+    curves = {}
+    for group, (times, survival) in zip(FST_MONTHS_GROUPS, fits):
+        if len(times) == 0:
+            continue
+        if times[0] > 0:
+            times = np.concatenate(([0.0], times))
+            survival = np.concatenate(([1.0], survival))
+        curves[group] = (times, survival)
+    return curves
 
 def perform_kaplan_meier_analysis(processed_df):
     """Kaplan-Meier 생존 분석 수행"""
     # Kaplan-Meier 피팅
-    durations = processed_df["done_month_corrected"]
-    events = processed_df["churn"]
+    timeline, survival = kaplan_meier(processed_df["done_month_corrected"], processed_df["churn"])
 
-    kmf = KaplanMeierFitter()
-    kmf.fit(durations, event_observed=events, label="전체")
-
-    # 생존곡선 데이터프레임 만들기
-    survival_df = kmf.survival_function_.reset_index()
-    survival_df.columns = ["개월", "생존확률"]
-
-    # 36개월까지만 필터
-    survival_df = survival_df[(survival_df["개월"] <= 36)&(survival_df["개월"]>=0)]
+    # 36개월까지만 필터한 생존곡선 데이터프레임
+    survival_df = _survival_frame(timeline, survival)
 
     # AUC 계산
-    auc_value = np.trapz(survival_df["생존확률"], survival_df["개월"])
+    auc_value = trapezoid(survival_df["생존확률"], survival_df["개월"])
 
     return survival_df, auc_value
 
 def create_monthly_distribution_chart(processed_df):
-    """월별 수업 시작 분포 차트 생성"""
+    """월별 수업 시작 분포 차트 생성 (입력 DataFrame은 수정하지 않음)"""
     st.subheader("📅 월별 수업 시작 분포")
 
-    # 월별 그룹화
-    processed_df['년월'] = processed_df['crda'].dt.to_period('M').astype(str)
-    monthly_counts = processed_df['년월'].value_counts().sort_index()
+    # 월별 집계 (load_data에서 계산한 crda 연-월 코드 bincount, 라벨은 월 단위로만 생성)
+    if 'crda_month_code' in processed_df.columns:
+        codes = processed_df['crda_month_code'].to_numpy(dtype=np.int64)
+    else:
+        codes = month_codes(processed_df['crda'])
+    monthly_counts = period_counts(codes)
+    monthly_counts = monthly_counts[monthly_counts['수업 수'] > 0]
+    labels = month_labels(monthly_counts['코드'].to_numpy())
 
     # 막대 그래프
     fig_monthly = go.Figure(data=[
-        go.Bar(x=monthly_counts.index, y=monthly_counts.values,
+        go.Bar(x=labels, y=monthly_counts['수업 수'],
                marker_color='steelblue',
-               text=monthly_counts.values,
+               text=monthly_counts['수업 수'],
                textposition='auto')
     ])
 
@@ -91,28 +116,16 @@ def create_grouped_survival_curves(processed_df):
     """fst_months별로 그룹화된 생존곡선 생성"""
     st.subheader("📊 결제기간별 생존곡선 비교")
 
-    # 특정 결제기간만 선택
-    fst_months_groups = [1, 3, 6, 12]
-
     fig = go.Figure()
     colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown']
 
-    for i, group in enumerate(fst_months_groups):
-        # 그룹별 데이터 필터링
-        group_data = processed_df[processed_df['fst_months'] == group]
-
-        if len(group_data) > 0:
-            # Kaplan-Meier 피팅
-            durations = group_data["done_month_corrected"]
-            events = group_data["churn"]
-
-            kmf = KaplanMeierFitter()
-            kmf.fit(durations, event_observed=events, label=f"{group}개월")
+    # 특정 결제기간 그룹별 Kaplan-Meier (한 번의 그룹 정렬)
+    curves = _fit_fst_month_groups(processed_df)
 
+    for i, group in enumerate(FST_MONTHS_GROUPS):
+        if group in curves:
             # 생존곡선 데이터 생성
-            survival_df = kmf.survival_function_.reset_index()
-            survival_df.columns = ["개월", "생존확률"]
-            survival_df = survival_df[(survival_df["개월"] <= 36) & (survival_df["개월"] >= 0)]
+            survival_df = _survival_frame(*curves[group])
 
             # 라인 추가
             fig.add_trace(go.Scatter(
@@ -143,13 +156,11 @@ def create_auc_analysis_table(processed_df):
     st.subheader("📊 AUC 분석 결과")
 
     results = []
-    groups = [
-        ("전체", None),
-        ("1개월 구매", 1),
-        ("3개월 구매", 3),
-        ("6개월 구매", 6),
-        ("12개월 구매", 12)
-    ]
+    groups = [(name, None if value is None else int(value)) for name, value in PAY_MONTH_GROUPS]
+
+    # 그룹별 Kaplan-Meier는 한 번의 그룹 정렬로 계산, 전체는 별도 피팅
+    curves = _fit_fst_month_groups(processed_df)
+    curves[None] = kaplan_meier(processed_df["done_month_corrected"], processed_df["churn"])
 
     for group_name, fst_month in groups:
         # 데이터 필터링
@@ -158,39 +169,109 @@ def create_auc_analysis_table(processed_df):
         else:
             data = processed_df[processed_df['fst_months'] == fst_month]
 
-        if len(data) > 0:
+        if len(data) > 0 and fst_month in curves:
             # 기본 통계
             sample_size = len(data)
             churn_count = data['churn'].sum()
             churn_rate = churn_count / sample_size * 100
 
-            # Kaplan-Meier 피팅
-            durations = data["done_month_corrected"]
-            events = data["churn"]
-
-            kmf = KaplanMeierFitter()
-            kmf.fit(durations, event_observed=events)
+            timeline, survival = curves[fst_month]
 
             # 생존곡선 데이터 생성 (36개월까지)
-            survival_df = kmf.survival_function_.reset_index()
-            survival_df.columns = ["개월", "생존확률"]
-            survival_df = survival_df[(survival_df["개월"] <= 36) & (survival_df["개월"] >= 0)]
+            survival_df = _survival_frame(timeline, survival)
 
-            # AUC 계산
-            auc_value = np.trapz(survival_df["생존확률"], survival_df["개월"])
+            # AUC 계산 (KM 점 사다리꼴) / RMST (KM 계단함수 적분)
+            auc_value = trapezoid(survival_df["생존확률"], survival_df["개월"])
+            rmst_value = rmst(timeline, survival, 36)
 
-            # 중위 생존기간 계산
-            median_survival = kmf.median_survival_time_
-            median_survival = median_survival if not pd.isna(median_survival) else "도달 안함"
+            # 중위 생존기간 계산 (도달하지 않으면 inf)
+            median_value = median_survival(timeline, survival)
 
             results.append({
                 "구분": group_name,
                 "샘플 수": f"{sample_size:,}개",
                 "중단율": f"{churn_rate:.1f}%",
                 "AUC (36개월)": f"{auc_value:.2f}개월",
-                "중위 생존기간": f"{median_survival:.1f}개월" if median_survival != "도달 안함" else median_survival
+                "RMST (36개월)": f"{rmst_value:.2f}개월",
+                "중위 생존기간": f"{median_value:.1f}개월" if np.isfinite(median_value) else "도달 안함"
             })
 
     # 데이터프레임으로 변환하여 표시
     results_df = pd.DataFrame(results)
-    st.dataframe(results_df, width='stretch')
\ No newline at end of file
+    st.dataframe(results_df, width='stretch')
+
+def create_sensitivity_heatmap(grid_df, current_cutoff=30, current_factor=0.8):
+    """CUTOFF 일수 × 보정계수별 AUC 히트맵 (현재 설정 표시)"""
+    st.subheader("🧪 이탈 판정 기준 민감도 (AUC)")
+
+    auc_table = grid_df.pivot(index='cutoff 일수', columns='보정계수', values='AUC')
+    x_labels = [f"{f:.2f}" for f in auc_table.columns]
+    y_labels = [f"{d}일" for d in auc_table.index]
+
+    fig = go.Figure(data=go.Heatmap(
+        z=auc_table.values,
+        x=x_labels,
+        y=y_labels,
+        colorscale='Blues',
+        text=np.round(auc_table.values, 2),
+        texttemplate='%{text}',
+        colorbar=dict(title='AUC (개월)'),
+        hovertemplate='cutoff: %{y}<br>보정계수: %{x}<br>AUC: %{z:.2f}개월<extra></extra>'
+    ))
+
+    # 현재 설정 셀 강조
+    if current_cutoff in auc_table.index and np.isclose(auc_table.columns, current_factor).any():
+        fig.add_trace(go.Scatter(
+            x=[f"{current_factor:.2f}"],
+            y=[f"{current_cutoff}일"],
+            mode='markers',
+            marker=dict(symbol='square-open', size=40, color='red', line=dict(width=3)),
+            name='현재 설정',
+            hoverinfo='skip'
+        ))
+
+    fig.update_layout(
+        xaxis_title='done_month 보정계수',
+        yaxis_title='CUTOFF (마지막 수업 후 경과일)',
+        height=450,
+        showlegend=False
+    )
+    st.plotly_chart(fig, width='stretch')
+
+    auc_range = grid_df['AUC'].max() - grid_df['AUC'].min()
+    st.caption(f"격자 전체 AUC 범위: {grid_df['AUC'].min():.2f} ~ {grid_df['AUC'].max():.2f}개월 (폭 {auc_range:.2f}개월)")
+
+def create_cumulative_incidence_charts(incidence, max_month=36):
+    """결제기간별 이탈 사유 누적발생률 누적 영역 차트 (Aalen-Johansen)"""
+    st.subheader("🧭 이탈 사유별 누적발생률")
+
+    colors = ['#d62728', '#ff7f0e', '#2ca02c', '#9467bd', '#8c564b', '#7f7f7f']
+    tabs = st.tabs(list(incidence.keys()))
+    for tab, (name, frame) in zip(tabs, incidence.items()):
+        frame = frame[(frame['개월'] >= 0) & (frame['개월'] <= max_month)]
+        cause_columns = [c for c in frame.columns if c not in ('개월', '생존확률')]
+
+        fig = go.Figure()
+        for color, cause in zip(colors, cause_columns):
+            fig.add_trace(go.Scatter(
+                x=frame['개월'], y=frame[cause] * 100,
+                mode='lines', line=dict(width=0.5, color=color, shape='hv'),
+                stackgroup='one', name=cause,
+                hovertemplate=f'{cause}<br>%{{x:.1f}}개월: %{{y:.1f}}%<extra></extra>'
+            ))
+        fig.add_trace(go.Scatter(
+            x=frame['개월'], y=frame['생존확률'] * 100,
+            mode='lines', line=dict(width=0.5, color='#c7d7ea', shape='hv'),
+            stackgroup='one', name='유지',
+            hovertemplate='유지<br>%{x:.1f}개월: %{y:.1f}%<extra></extra>'
+        ))
+
+        fig.update_layout(
+            xaxis_title='개월',
+            yaxis_title='누적 비율 (%)',
+            yaxis=dict(range=[0, 100]),
+            height=450,
+            hovermode='x unified'
+        )
+        with tab:
+            st.plotly_chart(fig, width='stretch')
@@ -0,0 +1,174 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy.integrate import trapezoid
+
+from utils.data_processing import CUTOFF_DAYS, determine_status_and_correct_month
+from utils.survival import kaplan_meier_from_counts
+
+# 대시보드 호스트 기본 메모리 한도 (배치 크기 산정용)
+DEFAULT_MEMORY_LIMIT = 256 * 1024 ** 2
+
+DATE_COLUMNS = ['crda', 'reactive_datetime', 'fst_pay_date', 'lst_done_at', 'lst_tutoring_datetime']
+
+# KM 집계에 필요한 컬럼만 읽음
+KM_COLUMNS = ['crda', 'fst_pay_date', 'tutoring_state', 'done_month', 'lst_tutoring_datetime']
+
+_PARTITION_PATTERN = re.compile(r'^crda_month=(\d{4})-(\d{2})$')
+
+
+def _partition_dir(root, month):
+    return os.path.join(root, f"crda_month={month}")
+
+
+def write_crda_partitions(source, root, chunksize=200_000):
+    """
+    원본 CSV(또는 DataFrame)를 crda 월별 Parquet 파티션으로 저장
+    - CSV는 chunksize 단위로 읽어 메모리 사용량을 제한
+    - 저장 위치: root/crda_month=YYYY-MM/part-XXXXX.parquet
+    """
+    if isinstance(source, pd.DataFrame):
+        chunks = (source.iloc[i:i + chunksize] for i in range(0, len(source), chunksize))
+    else:
+        chunks = pd.read_csv(source, chunksize=chunksize)
+
+    n_rows = 0
+    for chunk_no, chunk in enumerate(chunks):
+        chunk = chunk.drop(columns='student_name', errors='ignore')
+        for col in DATE_COLUMNS:
+            if col in chunk.columns:
+                chunk[col] = pd.to_datetime(chunk[col], errors='coerce')
+
+        months = chunk['crda'].dt.strftime('%Y-%m')
+        for month, part in chunk.groupby(months, sort=False):
+            os.makedirs(_partition_dir(root, month), exist_ok=True)
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            pq.write_table(table, os.path.join(_partition_dir(root, month), f"part-{chunk_no:05d}.parquet"))
+
+        n_rows += len(chunk)
+    return n_rows
+
+
+def list_partitions(root, START_DATE=None, END_DATE=None):
+    """
+    기간과 겹치는 월 파티션만 반환 (파티션 디렉터리 이름으로 가지치기)
+    반환: [(월 시작일, 디렉터리 경로)] (월 오름차순)
+    """
+    start = pd.Timestamp(START_DATE).to_period('M') if START_DATE is not None else None
+    end = pd.Timestamp(END_DATE).to_period('M') if END_DATE is not None else None
+
+    partitions = []
+    for name in os.listdir(root):
+        match = _PARTITION_PATTERN.match(name)
+        if not match:
+            continue
+        month = pd.Period(f"{match.group(1)}-{match.group(2)}", freq='M')
+        if (start is not None and month < start) or (end is not None and month > end):
+            continue
+        partitions.append((month.start_time, os.path.join(root, name)))
+
+    return sorted(partitions)
+
+
+def source_dates(root, cutoff_days=CUTOFF_DAYS):
+    """
+    load_data와 동일한 기준일 계산 (가장 최근 파티션의 crda 컬럼만 읽음)
+    반환: (CURRNET_DATE, CUTOFF_DATE)
+    """
+    partitions = list_partitions(root)
+    if not partitions:
+        raise FileNotFoundError(f"Parquet 파티션이 없습니다: {root}")
+
+    _, latest = partitions[-1]
+    current_date = max(
+        pq.read_table(os.path.join(latest, f), columns=['crda'], memory_map=True)['crda'].to_pandas().max()
+        for f in sorted(os.listdir(latest)) if f.endswith('.parquet')
+    )
+    return current_date, current_date - pd.Timedelta(days=cutoff_days)
+
+
+def _batch_rows(parquet_file, memory_limit):
+    """메모리 한도 안에 들어오는 배치 행 수 (pandas 변환 및 중간 계산 여유분 ×4)"""
+    metadata = parquet_file.metadata
+    if metadata.num_rows == 0:
+        return 1
+    bytes_per_row = sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups)) / metadata.num_rows
+    return max(int(memory_limit / (bytes_per_row * 4)), 1024)
+
+
+def iter_partition_batches(root, START_DATE, END_DATE, columns=KM_COLUMNS, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """
+    기간에 해당하는 파티션을 memory-map으로 열어 배치 단위 DataFrame으로 순회
+    - process_data와 동일한 기간/유효 결제일 필터 적용
+    """
+    start = pd.to_datetime(START_DATE)
+    end = pd.to_datetime(END_DATE)
+
+    for _, path in list_partitions(root, START_DATE, END_DATE):
+        for name in sorted(os.listdir(path)):
+            if not name.endswith('.parquet'):
+                continue
+
+            parquet_file = pq.ParquetFile(os.path.join(path, name), memory_map=True)
+            batch_size = _batch_rows(parquet_file, memory_limit)
+
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=list(columns)):
+                df = batch.to_pandas()
+                mask = df['fst_pay_date'].notna() & (df['crda'] >= start) & (df['crda'] <= end)
+                if mask.any():
+                    yield df[mask]
+
+
+def accumulate_km_counts(root, START_DATE, END_DATE, CUTOFF_DATE, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """
+    파티션별로 이탈 판정/보정 후 KM 집계표(시점별 이탈 수, 전체 수)를 누적
+    - 메모리에는 배치 하나와 고유 시점 수 크기의 집계표만 유지
+    반환: (집계표 DataFrame, 요약 dict)
+    """
+    counts = None
+    summary = {'total_count': 0, 'finished_count': 0, 'corrected_rows': 0}
+
+    for df in iter_partition_batches(root, START_DATE, END_DATE, memory_limit=memory_limit):
+        status = determine_status_and_correct_month(df, CUTOFF_DATE)
+
+        batch_counts = (
+            pd.DataFrame({
+                'duration': status['done_month_corrected'].to_numpy(dtype=np.float64),
+                'event': status['churn'].to_numpy(dtype=np.int64),
+            })
+            .groupby('duration')
+            .agg(deaths=('event', 'sum'), totals=('event', 'size'))
+        )
+        counts = batch_counts if counts is None else counts.add(batch_counts, fill_value=0)
+
+        summary['total_count'] += len(df)
+        summary['finished_count'] += int(status['churn'].sum())
+        summary['corrected_rows'] += int((status['done_month_corrected'] != df['done_month'].fillna(0)).sum())
+
+    if counts is None:
+        counts = pd.DataFrame({'deaths': [], 'totals': []}, index=pd.Index([], name='duration'))
+    return counts.sort_index(), summary
+
+
+def perform_kaplan_meier_analysis_out_of_core(root, START_DATE, END_DATE, CUTOFF_DATE,
+                                              memory_limit=DEFAULT_MEMORY_LIMIT):
+    """
+    perform_kaplan_meier_analysis의 out-of-core 버전 (파티션별 집계표 누적 후 KM)
+    반환: (survival_df, auc_value, 요약 dict)
+    """
+    counts, summary = accumulate_km_counts(root, START_DATE, END_DATE, CUTOFF_DATE, memory_limit)
+    timeline, survival = kaplan_meier_from_counts(counts.index.to_numpy(), counts['deaths'], counts['totals'])
+
+    survival_df = pd.DataFrame({"개월": timeline, "생존확률": survival})
+
+    # 36개월까지만 필터
+    survival_df = survival_df[(survival_df["개월"] <= 36) & (survival_df["개월"] >= 0)]
+
+    # AUC 계산
+    auc_value = trapezoid(survival_df["생존확률"], survival_df["개월"])
+
+    return survival_df, auc_value, summary
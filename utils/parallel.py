@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from utils.survival import kaplan_meier, km_auc, median_survival, survival_at
+
+# 워커 프로세스에서 공유메모리에 연결된 배열 (initializer에서 한 번만 설정, 풀 워커 전용)
+# - 현재 프로세스의 순차 경로는 사용하지 않음 (Streamlit 세션 스레드끼리 공유되므로)
+_SHARED = {}
+
+# n_workers 자동 결정 시 이보다 작으면 현재 프로세스에서 순차 실행
+# (20만 행 기준 순차 0.08초 < 프로세스 풀 기동 비용이라 병렬 이득이 없음)
+PARALLEL_MIN_ROWS = 2_000_000
+PARALLEL_MIN_GROUPS = 64
+
+
+def _pool_context():
+    """
+    워커 시작 방식: forkserver (없으면 spawn)
+    - Streamlit / 갱신 스레드가 도는 프로세스를 fork하지 않도록 fork는 사용하지 않음
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _attach_shared(dur_name, evt_name, n_rows):
+    """워커 초기화: 공유메모리 블록에 연결해 정렬된 duration/event 배열을 전역으로 보관"""
+    dur_shm = shared_memory.SharedMemory(name=dur_name)
+    evt_shm = shared_memory.SharedMemory(name=evt_name)
+    _SHARED["shm"] = (dur_shm, evt_shm)
+    _SHARED["durations"] = np.ndarray((n_rows,), dtype=np.float64, buffer=dur_shm.buf)
+    _SHARED["events"] = np.ndarray((n_rows,), dtype=np.int8, buffer=evt_shm.buf)
+
+
+def _analyze_slices(tasks, max_time, durations, events):
+    """
+    정렬된 배열의 [start, stop) 구간들을 그룹별로 분석
+    - tasks: (그룹번호, start, stop) 목록 (작은 그룹을 묶어서 한 번에 전달)
+    """
+    results = []
+    for gid, start, stop in tasks:
+        dur = durations[start:stop]
+        evt = events[start:stop]
+        timeline, survival = kaplan_meier(dur, evt, presorted=True)
+
+        results.append({
+            "gid": gid,
+            "n": stop - start,
+            "churn": int(evt.sum()),
+            "auc": km_auc(timeline, survival, max_time),
+            "survival_at_max": float(survival_at(timeline, survival, max_time)),
+            "median": float(median_survival(timeline, survival)),
+            "timeline": timeline,
+            "survival": survival,
+        })
+    return results
+
+
+def _analyze_shared_slices(tasks, max_time):
+    """풀 워커용: initializer가 연결한 공유메모리 배열에서 구간 분석"""
+    return _analyze_slices(tasks, max_time, _SHARED["durations"], _SHARED["events"])
+
+
+def _chunk_tasks(bounds, n_chunks):
+    """그룹 구간을 행 수 기준으로 비슷한 크기의 묶음으로 분할"""
+    sizes = np.array([stop - start for _, start, stop in bounds])
+    target = max(sizes.sum() / max(n_chunks, 1), 1)
+
+    chunks, current, current_size = [], [], 0
+    for task, size in zip(bounds, sizes):
+        current.append(task)
+        current_size += size
+        if current_size >= target:
+            chunks.append(current)
+            current, current_size = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def analyze_groups_parallel(df, by, duration_col="duration_days", event_col="이탈여부",
+                            time_scale=1.0, max_time=np.inf, n_workers=None, min_group_size=1):
+    """
+    세그먼트별 KM/AUC/중위생존기간을 프로세스 풀로 병렬 계산
+    1. 그룹 번호 → (그룹, duration) 순으로 한 번만 정렬
+    2. 정렬된 duration/event 배열을 공유메모리에 올림 (DataFrame 피클링 없음)
+    3. 워커는 [start, stop) 구간만 받아서 그룹별 KM 피팅
+    - time_scale: duration을 나눌 값 (예: 일 → 주 변환 시 7)
+    - n_workers: 프로세스 수 (1이면 현재 프로세스에서 순차 실행,
+      None이면 PARALLEL_MIN_ROWS / PARALLEL_MIN_GROUPS 미만은 순차, 이상은 CPU 수)
+    반환: (그룹별 요약 DataFrame, {그룹키: (timeline, survival)})
+    """
+    by = [by] if isinstance(by, str) else list(by)
+
+    grouped = df.groupby(by, sort=True, observed=True, dropna=False)
+    gids = grouped.ngroup().to_numpy()
+    keys = [key if isinstance(key, tuple) else (key,) for key in grouped.size().index]
+
+    durations = df[duration_col].to_numpy(dtype=np.float64) / time_scale
+    events = df[event_col].to_numpy(dtype=np.int8)
+
+    order = np.lexsort((durations, gids))
+    durations = durations[order]
+    events = events[order]
+    counts = np.bincount(gids, minlength=len(keys))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    bounds = [
+        (gid, int(start), int(start + count))
+        for gid, (start, count) in enumerate(zip(starts, counts))
+        if count >= min_group_size
+    ]
+
+    n_rows = len(durations)
+    if n_workers is None:
+        small = n_rows < PARALLEL_MIN_ROWS or len(bounds) < PARALLEL_MIN_GROUPS
+        n_workers = 1 if small else (os.cpu_count() or 1)
+
+    if n_workers == 1 or n_rows == 0:
+        results = _analyze_slices(bounds, max_time, durations, events)
+    else:
+        dur_shm = shared_memory.SharedMemory(create=True, size=max(durations.nbytes, 1))
+        evt_shm = shared_memory.SharedMemory(create=True, size=max(events.nbytes, 1))
+        try:
+            np.ndarray(durations.shape, dtype=durations.dtype, buffer=dur_shm.buf)[:] = durations
+            np.ndarray(events.shape, dtype=events.dtype, buffer=evt_shm.buf)[:] = events
+
+            # 워커당 여러 묶음을 배정해 큰 그룹이 한 워커에 몰리는 것을 완화
+            chunks = _chunk_tasks(bounds, n_workers * 4)
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=_pool_context(),
+                initializer=_attach_shared,
+                initargs=(dur_shm.name, evt_shm.name, n_rows),
+            ) as executor:
+                results = [
+                    res
+                    for chunk_result in executor.map(_analyze_shared_slices, chunks, [max_time] * len(chunks))
+                    for res in chunk_result
+                ]
+        finally:
+            dur_shm.close()
+            dur_shm.unlink()
+            evt_shm.close()
+            evt_shm.unlink()
+
+    rows, curves = [], {}
+    for res in results:
+        key = keys[res["gid"]]
+        curves[key] = (res["timeline"], res["survival"])
+        rows.append({
+            **dict(zip(by, key)),
+            "샘플 수": res["n"],
+            "이탈 수": res["churn"],
+            "중단율(%)": res["churn"] / res["n"] * 100,
+            "AUC": res["auc"],
+            "생존율": res["survival_at_max"],
+            "중위생존기간": res["median"],
+        })
+
+    summary_df = pd.DataFrame(rows, columns=by + ["샘플 수", "이탈 수", "중단율(%)", "AUC", "생존율", "중위생존기간"])
+    return summary_df, curves
+
+
+def benchmark_parallel_scaling(df, by, worker_counts=(1, 2, 4, 8), repeat=3, **kwargs):
+    """코어 수별 analyze_groups_parallel 소요시간 측정 (최소값 기준)"""
+    rows = []
+    for n_workers in worker_counts:
+        elapsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            analyze_groups_parallel(df, by, n_workers=n_workers, **kwargs)
+            elapsed.append(time.perf_counter() - start)
+        rows.append({"코어 수": n_workers, "소요시간(초)": min(elapsed)})
+
+    result_df = pd.DataFrame(rows)
+    result_df["속도향상"] = result_df["소요시간(초)"].iloc[0] / result_df["소요시간(초)"]
+    return result_df
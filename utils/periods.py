@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# ISO 주 코드 기준일 (1970-01-05 = 월요일)
+_WEEK_EPOCH = np.datetime64('1970-01-05', 'D')
+
+
+def month_codes(dates: pd.Series) -> np.ndarray:
+    """날짜 → 연-월 정수 코드 (연도 × 12 + 월 - 1, 결측은 -1)"""
+    dates = pd.to_datetime(dates)
+    codes = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=np.float64)
+    return np.where(np.isnan(codes), -1, codes).astype(np.int64)
+
+
+def week_codes(dates: pd.Series) -> np.ndarray:
+    """날짜 → ISO 연-주차 정수 코드 (기준 월요일로부터 지난 주 수, 결측은 -1)"""
+    days = pd.to_datetime(dates).to_numpy(dtype='datetime64[D]')
+    valid = ~np.isnat(days)
+    codes = np.full(len(days), -1, dtype=np.int64)
+    codes[valid] = (days[valid] - _WEEK_EPOCH).astype(np.int64) // 7
+    return codes
+
+
+def month_labels(codes: np.ndarray) -> list:
+    """연-월 코드 → 'YYYY-MM' 라벨 (버킷 단위)"""
+    return [f"{c // 12}-{c % 12 + 1:02d}" for c in codes]
+
+
+def month_starts(codes: np.ndarray) -> pd.DatetimeIndex:
+    """연-월 코드 → 월 시작일"""
+    return pd.to_datetime(month_labels(codes), format='%Y-%m')
+
+
+def week_labels(codes: np.ndarray) -> list:
+    """ISO 주 코드 → 'YYYY-Www' 라벨 (버킷 단위, 해당 주 월요일의 ISO 연도/주차)"""
+    mondays = pd.DatetimeIndex(_WEEK_EPOCH + np.asarray(codes, dtype=np.int64) * 7)
+    iso = mondays.isocalendar()
+    return [f"{y}-W{w}" for y, w in zip(iso['year'], iso['week'])]
+
+
+def period_counts(codes: np.ndarray, events=None) -> pd.DataFrame:
+    """
+    기간 코드별 시작 수 / 이탈 수 (np.bincount, 빈 기간은 0으로 채움)
+    - 결측 코드(-1)는 제외
+    반환: DataFrame(코드, 수업 수[, 이탈 수])
+    """
+    valid = codes >= 0
+    codes = codes[valid]
+    if len(codes) == 0:
+        columns = {'코드': [], '수업 수': []}
+        if events is not None:
+            columns['이탈 수'] = []
+        return pd.DataFrame(columns)
+
+    base = codes.min()
+    offset = codes - base
+    result = pd.DataFrame({
+        '코드': np.arange(base, codes.max() + 1),
+        '수업 수': np.bincount(offset),
+    })
+    if events is not None:
+        weights = np.nan_to_num(np.asarray(events, dtype=np.float64)[valid])
+        result['이탈 수'] = np.bincount(offset, weights=weights, minlength=len(result)).astype(np.int64)
+    return result
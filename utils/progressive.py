@@ -0,0 +1,225 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.kernels import grouped_product_limit
+from utils.periods import month_codes
+from utils.survival import HORIZON_DAYS, PAY_MONTH_GROUPS, UNIT_DAYS, km_auc, survival_at, fit_group_curves
+
+# 근사 결과에 사용할 층화 표본 크기 (0이면 근사 단계 생략)
+PREVIEW_SAMPLE_SIZE = 20_000
+
+# 오차 범위 계산용 층내 부트스트랩 반복 수
+BOOTSTRAP_ROUNDS = 50
+
+# 95% 정규 근사 신뢰구간 배수
+Z_95 = 1.96
+
+def stratum_codes(months, dates):
+    """
+    층 코드 = 결제개월수 × 결제 코호트 월
+    - months: 결제개월수 (원본 '최초 개월 수' 또는 처리 후 '결제개월수')
+    - dates: 결제등록일 (문자열이면 날짜로 변환, 변환 실패는 별도 층)
+    """
+    month_idx = pd.factorize(pd.Series(months).astype(str), use_na_sentinel=False)[0]
+    cohort = month_codes(pd.to_datetime(pd.Series(dates), errors='coerce'))
+    cohort_idx = pd.factorize(cohort)[0]
+    return month_idx.astype(np.int64) * (int(cohort_idx.max()) + 1 if len(cohort_idx) else 1) + cohort_idx
+
+
+def stratified_sample(strata, n, seed=0):
+    """
+    층별 비례 배분 무작위 표본 (비복원)
+    - 층별 배정 수 = floor(n × 층 비율), 남는 자리는 소수부가 큰 층부터 채움 → 전체 정확히 n개
+    - 비례 배분이므로 가중치 없이 모집단과 같은 층 구성을 유지
+    반환: 표본 행 위치 (오름차순)
+    """
+    strata = np.asarray(strata, dtype=np.int64)
+    total = len(strata)
+    if n >= total:
+        return np.arange(total)
+
+    counts = np.bincount(strata)
+    quota = counts * (n / total)
+    alloc = np.floor(quota).astype(np.int64)
+    remainder = n - int(alloc.sum())
+    if remainder > 0:
+        alloc[np.argsort(-(quota - alloc), kind='stable')[:remainder]] += 1
+
+    # 층 안에서 무작위 순서를 매겨 앞에서부터 배정 수만큼 선택 (정렬 한 번)
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(total), strata))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.arange(total) - starts[strata[order]]
+    return np.sort(order[rank < alloc[strata[order]]])
+
+
+def _bootstrap_indices(strata, n_boot, rng):
+    """층 안에서 복원추출한 부트스트랩 행 위치 (n_boot, n)"""
+    order = np.argsort(strata, kind='stable')
+    counts = np.bincount(strata)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    sorted_strata = strata[order]
+    draws = starts[sorted_strata] + np.floor(rng.random((n_boot, len(strata))) * counts[sorted_strata]).astype(np.int64)
+    return order[draws]
+
+
+def _step_values(times, survival, grid):
+    """KM 계단함수 (0 시점 생존확률 1)를 grid 시점에서 조회"""
+    if len(times) == 0:
+        return np.full(len(grid), np.nan)
+    idx = np.searchsorted(times, grid, side="right") - 1
+    return np.where(idx < 0, 1.0, survival[np.clip(idx, 0, None)])
+
+
+def _with_origin(times, survival):
+    if len(times) and times[0] > 0:
+        return np.concatenate(([0.0], times)), np.concatenate(([1.0], survival))
+    return times, survival
+
+
+def bootstrap_group_curves(df_processed, curves, groups=PAY_MONTH_GROUPS, n_boot=BOOTSTRAP_ROUNDS, seed=0):
+    """
+    층내 부트스트랩 (결제개월수 × 코호트 월)으로 그룹 곡선 / AUC / 생존율 분포 계산
+    - 반복 × 그룹을 정수 코드 하나로 합쳐 grouped_product_limit 한 번으로 전체 피팅
+    반환: {그룹명: dict(grid, survival (B, len(grid)), auc (B,), survival_at (B,))}
+    """
+    durations = df_processed['duration_days'].to_numpy(dtype=np.float64)
+    events = df_processed['이탈여부'].to_numpy(dtype=np.int64)
+    values = df_processed['결제개월수'].astype(str).to_numpy()
+    strata = stratum_codes(df_processed['결제개월수'], df_processed['결제등록일'])
+
+    rng = np.random.default_rng(seed)
+    boot = _bootstrap_indices(strata, n_boot, rng)
+    n_groups = len(groups)
+
+    codes, boot_durations, boot_events = [], [], []
+    for g, (_, value) in enumerate(groups):
+        rows = boot if value is None else np.where(values[boot] == value, boot, -1)
+        keep = rows >= 0
+        codes.append(np.broadcast_to(np.arange(n_boot)[:, None] * n_groups + g, rows.shape)[keep])
+        boot_durations.append(durations[rows[keep]])
+        boot_events.append(events[rows[keep]])
+
+    fits = grouped_product_limit(
+        np.concatenate(codes), np.concatenate(boot_durations), np.concatenate(boot_events),
+        n_groups=n_boot * n_groups
+    )
+
+    result = {}
+    for g, (name, _) in enumerate(groups):
+        if name not in curves:
+            continue
+        grid = curves[name].timeline_days
+        surv = np.empty((n_boot, len(grid)))
+        auc = np.empty(n_boot)
+        at_horizon = np.empty(n_boot)
+        for b in range(n_boot):
+            times, survival = fits[b * n_groups + g]
+            surv[b] = _step_values(times, survival, grid)
+            if len(times):
+                auc[b] = km_auc(*_with_origin(times, survival), HORIZON_DAYS)
+                at_horizon[b] = survival_at(*_with_origin(times, survival), HORIZON_DAYS)
+            else:
+                auc[b] = at_horizon[b] = np.nan
+        result[name] = {"grid": grid, "survival": surv, "auc": auc, "survival_at": at_horizon}
+    return result
+
+
+def approximate_analysis(raw, process, sample_size=PREVIEW_SAMPLE_SIZE, groups=PAY_MONTH_GROUPS,
+                         n_boot=BOOTSTRAP_ROUNDS, seed=0, month_col='최초 개월 수', date_col='payment_regdate'):
+    """
+    층화 표본으로 먼저 계산하는 근사 생존분석 (전체 처리/피팅 전에 보여줄 결과)
+    - raw: 원본 시트 DataFrame, process: 전처리 함수 (processing_google_sheet)
+    - 결제개월수 × 코호트 월 층별 비례 배분 표본만 전처리 + KM 피팅
+    - 오차 범위: 층내 부트스트랩 표준오차 × 유한모집단 보정 sqrt(1 - n/N), 95% 정규 근사
+    반환: dict(sample, curves, bands, kpis, sample_size, population_size, elapsed)
+    """
+    start = time.perf_counter()
+
+    strata = stratum_codes(raw[month_col], raw[date_col])
+    idx = stratified_sample(strata, sample_size, seed=seed)
+    sample = process(raw.iloc[idx])
+
+    # 전처리에서 제외되는 행(테스트 데이터 등) 비율만큼 모집단 크기 보정
+    population_size = len(sample) * len(raw) / max(len(idx), 1)
+    fpc = np.sqrt(max(1.0 - len(sample) / population_size, 0.0)) if population_size else 0.0
+
+    curves = fit_group_curves(sample, groups)
+    boot = bootstrap_group_curves(sample, curves, groups, n_boot=n_boot, seed=seed)
+
+    values = sample['결제개월수'].astype(str)
+    bands, rows = {}, []
+    for name, value in groups:
+        if name not in curves:
+            continue
+        curve, b = curves[name], boot[name]
+        se = np.nanstd(b["survival"], axis=0) * fpc
+        bands[name] = (np.clip(curve.survival - Z_95 * se, 0, 1), np.clip(curve.survival + Z_95 * se, 0, 1))
+
+        events = sample['이탈여부'] if value is None else sample.loc[values == value, '이탈여부']
+        rows.append({
+            "구분": name,
+            "표본 수": len(events),
+            "추정 수업 수": len(events) / len(sample) * population_size,
+            "중단율(%)": events.mean() * 100,
+            "AUC(일)": curve.auc("일"),
+            "AUC 표준오차(일)": np.nanstd(b["auc"]) * fpc,
+            "생존율": curve.survival_at(),
+            "생존율 표준오차": np.nanstd(b["survival_at"]) * fpc,
+        })
+
+    return {
+        "sample": sample,
+        "curves": curves,
+        "bands": bands,
+        "kpis": pd.DataFrame(rows),
+        "sample_size": len(sample),
+        "population_size": population_size,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def approximation_error(approx, exact_curves, unit="개월", horizon_days=HORIZON_DAYS):
+    """
+    근사 결과 vs 정확한 결과 오차
+    - AUC / 생존율 오차와 95% 구간 포함 여부
+    - 곡선 최대 오차: 두 계단함수의 horizon까지 최대 절대 차이
+    - 밴드 포함률: 정확한 곡선의 시점 중 근사 오차 범위 안에 있는 비율
+    """
+    kpis = approx["kpis"].set_index("구분")
+    rows = []
+    for name, curve in approx["curves"].items():
+        if name not in exact_curves:
+            continue
+        exact = exact_curves[name]
+        k = kpis.loc[name]
+
+        auc_approx, auc_exact = curve.auc(unit, horizon_days), exact.auc(unit, horizon_days)
+        auc_se = k["AUC 표준오차(일)"] / UNIT_DAYS[unit]
+        rate_approx, rate_exact = curve.survival_at(horizon_days), exact.survival_at(horizon_days)
+
+        grid = np.union1d(curve.timeline_days, exact.timeline_days)
+        grid = grid[grid <= horizon_days]
+        approx_values = survival_at(curve.timeline_days, curve.survival, grid)
+        exact_values = survival_at(exact.timeline_days, exact.survival, grid)
+
+        lower, upper = approx["bands"][name]
+        exact_grid = exact.timeline_days[exact.timeline_days <= horizon_days]
+        exact_on_grid = survival_at(exact.timeline_days, exact.survival, exact_grid)
+        inside = (exact_on_grid >= survival_at(curve.timeline_days, lower, exact_grid) - 1e-12) & \
+                 (exact_on_grid <= survival_at(curve.timeline_days, upper, exact_grid) + 1e-12)
+
+        rows.append({
+            "구분": name,
+            f"AUC 근사({unit})": auc_approx,
+            f"AUC 정확({unit})": auc_exact,
+            f"AUC 오차({unit})": auc_approx - auc_exact,
+            "AUC 구간 포함": abs(auc_approx - auc_exact) <= Z_95 * auc_se,
+            "생존율 오차(%p)": (rate_approx - rate_exact) * 100,
+            "곡선 최대 오차": float(np.max(np.abs(approx_values - exact_values))) if len(grid) else 0.0,
+            "밴드 포함률(%)": inside.mean() * 100 if len(inside) else np.nan,
+        })
+    return pd.DataFrame(rows)
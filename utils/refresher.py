@@ -0,0 +1,157 @@
+import threading
+import time
+from datetime import datetime
+from typing import Any, NamedTuple
+
+
+class Snapshot(NamedTuple):
+    """처리 완료된 데이터와 적재 시각"""
+    data: Any
+    loaded_at: datetime
+
+
+class SnapshotRefresher:
+    """
+    마지막 정상 스냅샷을 즉시 제공하고 백그라운드 스레드에서 갱신
+    - fetch(): 원본 데이터 로드 (예: 구글시트)
+    - process(raw): 분석용 전처리
+    - 새 스냅샷은 처리가 끝난 뒤 참조 한 번으로 교체되므로 읽는 쪽은 항상 완전한 데이터를 봄
+    - 갱신 실패 시 기존 스냅샷을 유지하고 last_error에 기록
+    - preview(raw): 첫 적재 때만 전체 처리 전에 먼저 계산하는 근사 결과 (예: 층화 표본 분석)
+    """
+
+    def __init__(self, fetch, process=None, interval=600, preview=None):
+        self._fetch = fetch
+        self._process = process
+        self._preview_fn = preview
+        self.interval = interval
+
+        self._snapshot = None
+        self._preview = None
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._preview_ready = threading.Event()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        self.last_error = None
+        self.last_attempt_at = None
+
+    @property
+    def snapshot(self):
+        """현재 스냅샷 (아직 한 번도 적재되지 않았으면 None)"""
+        return self._snapshot
+
+    @property
+    def preview(self):
+        """첫 적재 때 계산한 근사 결과 스냅샷 (없으면 None, 정확한 스냅샷 교체 후에도 오차 비교용으로 유지)"""
+        return self._preview
+
+    @property
+    def is_refreshing(self):
+        return self._refresh_lock.locked()
+
+    def age(self):
+        """현재 스냅샷의 경과 시간 (초)"""
+        if self._snapshot is None:
+            return None
+        return (datetime.now() - self._snapshot.loaded_at).total_seconds()
+
+    def refresh(self):
+        """
+        동기 갱신 - 이미 다른 스레드가 갱신 중이면 기다리지 않고 False 반환
+        반환: 새 스냅샷으로 교체했으면 True
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            self.last_attempt_at = datetime.now()
+            data = self._fetch()
+            if self._snapshot is None and self._preview is None and self._preview_fn is not None:
+                self._build_preview(data)
+            if self._process is not None:
+                data = self._process(data)
+            self._snapshot = Snapshot(data, datetime.now())
+            self.last_error = None
+            self._ready.set()
+            self._preview_ready.set()
+            return True
+        except Exception as e:
+            print(f"[{datetime.now()}] 데이터 갱신 실패: {str(e)}")
+            self.last_error = e
+            return False
+        finally:
+            self._refresh_lock.release()
+
+    def _build_preview(self, raw):
+        """근사 결과 계산 (실패해도 정확한 처리는 계속 진행)"""
+        try:
+            self._preview = Snapshot(self._preview_fn(raw), datetime.now())
+        except Exception as e:
+            print(f"[{datetime.now()}] 근사 결과 계산 실패: {str(e)}")
+        finally:
+            self._preview_ready.set()
+
+    def _run(self):
+        """주기 갱신 루프 (request_refresh 호출 시 즉시 깨어남)"""
+        while not self._stopped.is_set():
+            self.refresh()
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def start(self):
+        """백그라운드 갱신 스레드 시작 (첫 적재도 백그라운드에서 진행)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def request_refresh(self):
+        """즉시 갱신 요청 (비동기, 호출한 쪽은 기다리지 않음)"""
+        if self._thread is not None and self._thread.is_alive():
+            self._wakeup.set()
+        else:
+            threading.Thread(target=self.refresh, daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def wait(self, timeout=None):
+        """
+        첫 스냅샷이 준비될 때까지 대기 후 반환
+        - 이후 호출은 기다리지 않고 마지막 정상 스냅샷을 바로 반환
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._ready.is_set():
+            # 첫 적재가 실패한 경우 다음 주기까지 기다리지 않고 오류를 알림
+            if self.last_error is not None and not self.is_refreshing:
+                raise RuntimeError(f"데이터를 불러오지 못했습니다: {self.last_error}")
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("데이터 적재 대기 시간 초과")
+            self._ready.wait(0.1 if remaining is None else min(remaining, 0.1))
+        return self._snapshot
+
+    def wait_preview(self, timeout=None):
+        """
+        근사 결과 또는 정확한 스냅샷 중 먼저 준비되는 쪽까지 대기
+        반환: 정확한 스냅샷이 있으면 None, 아니면 근사 결과 스냅샷 (근사 계산 실패 시 정확한 스냅샷까지 대기)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._preview_ready.is_set():
+            if self.last_error is not None and not self.is_refreshing:
+                raise RuntimeError(f"데이터를 불러오지 못했습니다: {self.last_error}")
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("데이터 적재 대기 시간 초과")
+            self._preview_ready.wait(0.1 if remaining is None else min(remaining, 0.1))
+
+        if self._snapshot is not None:
+            return None
+        if self._preview is None:
+            self.wait(None if deadline is None else max(deadline - time.monotonic(), 0))
+            return None
+        return self._preview
@@ -0,0 +1,161 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.survival import SurvivalCurve, fit_group_curves, kaplan_meier
+
+# 결과 표에 함께 내보낼 수업 정보 컬럼 (존재하는 것만)
+EXPORT_COLUMNS = ['lvt', 'user_No', '결제등록일', '학년', '교과/탐구', '결제개월수', '단계', 'duration_days']
+
+# 일 격자 경로를 쓰는 최대 duration (그룹 수 × 일수 크기의 표를 만듦)
+DENSE_MAX_DAYS = 100_000
+
+
+def _stack_curves(curves):
+    """
+    그룹별 일 단위 곡선을 하나의 정렬된 키 배열로 연결
+    - 키 = 그룹번호 × span + 시점 → searchsorted 한 번으로 모든 그룹 조회
+    반환: (keys, survival, span)
+    """
+    span = max(curve.timeline_days[-1] for curve in curves) + 1
+    # 조회 시점(t + Δ)이 다음 그룹 구간을 넘지 않도록 충분히 큰 간격
+    span = 2 ** int(np.ceil(np.log2(span * 4 + 1)))
+
+    keys = np.concatenate([i * span + curve.timeline_days for i, curve in enumerate(curves)])
+    survival = np.concatenate([curve.survival for curve in curves])
+    return keys, survival, span
+
+
+def conditional_survival(curves, group_idx, tenure_days, horizon_days):
+    """
+    현재 재원기간 t에서 horizon_days 이후까지 유지될 확률 S(t+Δ)/S(t) (벡터화)
+    - curves: SurvivalCurve 목록, group_idx: 각 수업의 곡선 번호
+    - t + Δ가 곡선의 마지막 시점을 넘으면 마지막 생존확률 유지 (KM 계단함수와 동일)
+    """
+    keys, survival, span = _stack_curves(curves)
+    last_idx = np.cumsum([len(curve.timeline_days) for curve in curves]) - 1
+
+    tenure = np.asarray(tenure_days, dtype=np.float64)
+    base = group_idx * span
+
+    idx_now = np.searchsorted(keys, base + tenure, side="right") - 1
+    idx_later = np.searchsorted(keys, base + tenure + horizon_days, side="right") - 1
+    idx_later = np.minimum(idx_later, last_idx[group_idx])
+
+    s_now = survival[idx_now]
+    s_later = survival[idx_later]
+    return np.divide(s_later, s_now, out=np.zeros_like(s_now), where=s_now > 0)
+
+
+def _dense_retention(codes, days, events, n_groups, horizon_days):
+    """
+    정수 일 단위 duration의 그룹별 조건부 유지확률표 (정렬 없이 bincount)
+    - 일 격자에서 KM 누적곱: 이탈이 없는 날은 인자 1이므로 KM 계단함수의 정수 시점 값과 같음
+    - 격자 끝 이후는 마지막 생존확률 유지 (conditional_survival과 동일)
+    반환: (n_groups + 1, span) 표 R[g, t] = S_g(t + Δ) / S_g(t), 마지막 행 = 전체 곡선
+    """
+    span = int(days.max()) + 1 if len(days) else 1
+    bucket = np.where(codes < 0, n_groups, codes)
+    key = bucket * span + days
+
+    size = (n_groups + 1) * span
+    totals = np.bincount(key, minlength=size).reshape(n_groups + 1, span).astype(np.float64)
+    deaths = np.bincount(key, weights=events, minlength=size).reshape(n_groups + 1, span)
+
+    # 마지막 행은 그룹 값이 없는 수업용 전체 곡선 (모든 그룹 합계)
+    totals[-1] = totals.sum(axis=0)
+    deaths[-1] = deaths.sum(axis=0)
+
+    at_risk = np.cumsum(totals[:, ::-1], axis=1)[:, ::-1]
+    hazard = np.divide(deaths, at_risk, out=np.zeros_like(deaths), where=at_risk > 0)
+    survival = np.cumprod(1.0 - hazard, axis=1)
+
+    later = survival[:, np.minimum(np.arange(span) + int(horizon_days), span - 1)]
+    return np.divide(later, survival, out=np.zeros_like(survival), where=survival > 0)
+
+
+def score_active_lessons(df_processed, horizon_weeks=4, group_col='결제개월수',
+                         duration_col='duration_days', event_col='이탈여부'):
+    """
+    활성 수업(이탈여부 == 0)의 향후 horizon_weeks주 이탈 위험 일괄 계산
+    1. 그룹별 KM 곡선 피팅 (그룹 값이 없으면 전체 곡선 사용)
+       - duration이 정수 일이면 (그룹 × 일) 격자 bincount로 정렬 없이 유지확률표 계산
+       - 아니면 (그룹, duration) 한 번 정렬 후 searchsorted로 조회
+    2. 이탈 위험 내림차순 정렬 (격자 경로는 유지확률 순위 코드의 radix 정렬)
+    3. 내보낼 컬럼만 한 번에 행 재배열
+    """
+    # 그룹 코드는 한 번만 계산 (-1 = 그룹 값 없음)
+    codes, labels = pd.factorize(df_processed[group_col])
+    durations = df_processed[duration_col].to_numpy()
+    events = df_processed[event_col].to_numpy(dtype=np.int64)
+    horizon_days = horizon_weeks * 7
+
+    active_pos = np.flatnonzero(events == 0)
+    group_idx = codes[active_pos].astype(np.int64)
+    group_idx[group_idx < 0] = len(labels)
+
+    integer_days = (
+        np.issubdtype(durations.dtype, np.integer)
+        or bool(np.all(np.mod(durations, 1) == 0))
+    ) and len(durations) > 0 and durations.min() >= 0 and durations.max() < DENSE_MAX_DAYS
+
+    if integer_days:
+        days = durations.astype(np.int64)
+        table = _dense_retention(codes, days, events, len(labels), horizon_days)
+        cell = group_idx * table.shape[1] + days[active_pos]
+        retention = table.ravel()[cell]
+
+        # 같은 유지확률은 같은 순위 코드 → 안정 정렬 결과가 유지확률 안정 정렬과 같음
+        values, rank_codes = np.unique(table.ravel(), return_inverse=True)
+        rank_dtype = np.uint16 if len(values) <= np.iinfo(np.uint16).max else np.int64
+        rank_order = np.argsort(rank_codes.astype(rank_dtype)[cell], kind='stable')
+    else:
+        durations = durations.astype(np.float64)
+        # (그룹, duration) 한 번 정렬 후 그룹 구간별 KM, 마지막 번호 = 전체 곡선
+        order = np.lexsort((durations, codes))
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        curves = [
+            SurvivalCurve(*kaplan_meier(durations[order[lo:hi]], events[order[lo:hi]], presorted=True))
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+        curves.append(SurvivalCurve.fit(durations, events))
+
+        retention = conditional_survival(curves, group_idx, durations[active_pos], horizon_days)
+        # 위험 내림차순(= 유지확률 오름차순)
+        rank_order = np.argsort(retention, kind='stable')
+
+    # 내보낼 컬럼만 골라 한 번만 행 재배열
+    columns = [df_processed.columns.get_loc(c) for c in EXPORT_COLUMNS if c in df_processed.columns]
+    scored = df_processed.iloc[active_pos[rank_order], columns].reset_index(drop=True)
+    scored.insert(0, '위험순위', np.arange(1, len(scored) + 1))
+    scored[f'{horizon_weeks}주 유지확률'] = retention[rank_order]
+    scored[f'{horizon_weeks}주 이탈위험'] = 1 - retention[rank_order]
+    return scored
+
+
+def benchmark_scoring(n_active=1_000_000, horizon_weeks=4, seed=0):
+    """활성 수업 n_active건 점수 계산 소요시간 (곡선 피팅 포함 / 조회만)"""
+    from utils.synthetic import make_processed_sheet
+
+    df = make_processed_sheet(n_active, seed=seed)
+    df['이탈여부'] = 0
+    # 곡선 추정을 위한 이탈 수업 추가
+    history = make_processed_sheet(n_active // 5, seed=seed + 1)
+    df = pd.concat([df, history], ignore_index=True)
+
+    start = time.perf_counter()
+    scored = score_active_lessons(df, horizon_weeks=horizon_weeks)
+    elapsed_total = time.perf_counter() - start
+
+    curves = list(fit_group_curves(df, [(v, v) for v in ["1", "3", "6", "12"]]).values())
+    group_idx = pd.Categorical(df['결제개월수'], categories=["1", "3", "6", "12"]).codes.astype(np.int64)
+    start = time.perf_counter()
+    conditional_survival(curves, group_idx, df['duration_days'].to_numpy(dtype=np.float64), horizon_weeks * 7)
+    elapsed_lookup = time.perf_counter() - start
+
+    return pd.DataFrame({
+        "단계": ["전체 (피팅 + 조회 + 정렬)", "조회만 (searchsorted)"],
+        "활성 수업 수": [len(scored), len(df)],
+        "소요시간(초)": [elapsed_total, elapsed_lookup],
+    })
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_processing import FINISHED_STATES, DONE_MONTH_DAYS
+from utils.survival import km_auc_trapezoid_batch
+
+DEFAULT_CUTOFF_DAYS = (14, 30, 45, 60, 90)
+DEFAULT_CORRECTION_FACTORS = (0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+def sensitivity_grid(df, START_DATE, END_DATE, CURRNET_DATE,
+                     cutoff_days=DEFAULT_CUTOFF_DAYS,
+                     correction_factors=DEFAULT_CORRECTION_FACTORS,
+                     max_time=36):
+    """
+    CUTOFF_DATE(현재 시점 - N일) × done_month 보정계수 격자별 AUC 민감도 분석
+    - process_data를 조합마다 다시 실행하지 않고, 파라미터 축으로 브로드캐스팅해
+      (cutoff 수 × 보정계수 수 × 수업 수) 이탈여부/보정 done_month를 한 번에 계산
+    - AUC는 perform_kaplan_meier_analysis와 같은 0~max_time 사다리꼴 적분
+    반환: 조합별 결과 DataFrame (cutoff 일수, 보정계수, 이탈 수, 보정 수, AUC)
+    """
+    cutoff_days = np.asarray(cutoff_days, dtype=np.int64)
+    factors = np.asarray(correction_factors, dtype=np.float64)
+
+    # process_data와 동일한 기간 / 유효 결제일 필터
+    in_period = (
+        df['fst_pay_date'].notna() &
+        (df['crda'] >= pd.to_datetime(START_DATE)) &
+        (df['crda'] <= pd.to_datetime(END_DATE))
+    )
+    data = df[in_period]
+
+    done_month = data['done_month'].to_numpy(dtype=np.float64)
+    base_month = np.nan_to_num(done_month, nan=0.0)
+    explicit = data['tutoring_state'].isin(FINISHED_STATES).to_numpy()
+    active = (data['tutoring_state'] == 'ACTIVE').to_numpy()
+    lst = data['lst_tutoring_datetime']
+    actual_months = ((lst - data['crda']).dt.days / DONE_MONTH_DAYS).to_numpy(dtype=np.float64)
+
+    # 마지막 수업일의 현재 시점 대비 경과일 (NaT → NaN, 비교 결과 False)
+    days_since_lst = ((pd.Timestamp(CURRNET_DATE) - lst).dt.total_seconds() / 86400).to_numpy(dtype=np.float64)
+
+    # (cutoff, 수업) : lst < CURRNET_DATE - cutoff  ⇔  경과일 > cutoff
+    implicit = (~explicit & active)[None, :] & (days_since_lst[None, :] > cutoff_days[:, None])
+    churn = explicit[None, :] | implicit
+    needs_correction = implicit & (done_month > actual_months)[None, :] & data['crda'].notna().to_numpy()[None, :]
+
+    # (cutoff, 보정계수, 수업)
+    corrected = np.where(
+        needs_correction[:, None, :],
+        actual_months[None, None, :] * factors[None, :, None],
+        base_month[None, None, :]
+    )
+    events = np.broadcast_to(churn[:, None, :], corrected.shape)
+
+    n_cut, n_fac, n_obs = corrected.shape
+    auc = km_auc_trapezoid_batch(
+        corrected.reshape(n_cut * n_fac, n_obs),
+        events.reshape(n_cut * n_fac, n_obs),
+        max_time
+    ).reshape(n_cut, n_fac)
+
+    cut_grid, fac_grid = np.meshgrid(cutoff_days, factors, indexing='ij')
+    return pd.DataFrame({
+        'cutoff 일수': cut_grid.ravel(),
+        '보정계수': fac_grid.ravel(),
+        '이탈 수': np.repeat(churn.sum(axis=1), n_fac),
+        '보정 수': np.repeat(needs_correction.sum(axis=1), n_fac),
+        'AUC': auc.ravel(),
+    })
@@ -0,0 +1,108 @@
+import gc
+import time
+import tracemalloc
+
+import pandas as pd
+
+# 세션당 추가 메모리 허용치 (공유 스냅샷 크기 대비 비율, 이를 넘으면 세션마다 복사본이 생긴 것)
+MAX_SESSION_MEMORY_FRACTION = 0.05
+
+
+def enable_copy_on_write():
+    """
+    pandas Copy-on-Write 활성화
+    - 프로세스 전역 설정: 같은 프로세스의 모든 세션 / 페이지 / 모듈의 pandas 동작이 바뀜
+      (연쇄 대입 df[a][b] = v 같은 원본 수정은 더 이상 원본에 반영되지 않음)
+    - 대시보드 진입점(mainv2) 한 곳에서만 호출하고, 다른 모듈 / 페이지 / 측정 코드는 호출하지 않음
+      (측정 코드는 pd.option_context로 범위를 한정)
+    - 파생 DataFrame/Series는 원본 데이터를 공유하고, 쓰기가 일어난 컬럼만 복사
+      → 세션별 뷰가 공유 스냅샷을 변경하거나 전체 복사본을 만들지 않음 (pandas 3 기본 동작)
+    """
+    pd.set_option("mode.copy_on_write", True)
+
+
+def session_view(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    세션별 불변 뷰 (얕은 복사 - 컬럼 데이터는 공유 스냅샷과 공유)
+    - 뷰에 컬럼을 추가/수정해도 공유 스냅샷에는 영향 없음 (enable_copy_on_write 이후)
+    """
+    return df.copy(deep=False)
+
+
+def _frame_nbytes(df):
+    return df.memory_usage(index=True, deep=True).sum()
+
+
+def simulate_sessions(n_sessions=(1, 10, 30), n_rows=200_000, seed=0):
+    """
+    동시 접속 N개 세션의 메모리 사용량 시뮬레이션 (tracemalloc 기준)
+    - 복사 방식: 세션마다 전처리 복사본 + 주별 차트 복사본을 유지 (이전 mainv2 동작)
+    - 공유 방식: 프로세스 공유 스냅샷 하나 + 세션별 session_view
+    각 세션은 mainv2의 차트 데이터 준비(월별/주별 집계)를 수행하고, 세션 객체를 동시에 유지
+    - 대시보드와 같게 Copy-on-Write 설정에서 실행 (이 함수 안에서만 적용)
+    반환: 세션 수 × 방식별 추가 메모리(MB)와 소요시간
+    """
+    from utils.synthetic import make_processed_sheet
+    from utils.visualization import create_monthly_bar_chart, create_weekly_bar_chart
+
+    shared = make_processed_sheet(n_rows, seed=seed)
+
+    def legacy_session():
+        df = shared.copy(deep=True)              # processing_google_sheet의 df.copy()
+        weekly = df.copy(deep=True)              # create_weekly_bar_chart의 df.copy()
+        create_monthly_bar_chart(df)
+        create_weekly_bar_chart(df)
+        return df, weekly
+
+    def shared_session():
+        df = session_view(shared)
+        create_monthly_bar_chart(df)
+        create_weekly_bar_chart(df)
+        return df,
+
+    rows = []
+    for n in n_sessions:
+        for name, session in [("복사 (세션별 DataFrame)", legacy_session), ("공유 스냅샷 + 뷰", shared_session)]:
+            gc.collect()
+            with pd.option_context("mode.copy_on_write", True):
+                tracemalloc.start()
+                start = time.perf_counter()
+                sessions = [session() for _ in range(n)]
+                elapsed = time.perf_counter() - start
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+            rows.append({
+                "세션 수": n,
+                "방식": name,
+                "추가 메모리(MB)": current / 1024 ** 2,
+                "최대 메모리(MB)": peak / 1024 ** 2,
+                "소요시간(초)": elapsed,
+            })
+            del sessions
+
+    result = pd.DataFrame(rows)
+    result.attrs["스냅샷 크기(MB)"] = _frame_nbytes(shared) / 1024 ** 2
+    return result
+
+
+def check_session_memory(n_sessions=(1, 10), n_rows=50_000, max_fraction=MAX_SESSION_MEMORY_FRACTION, seed=0):
+    """
+    공유 스냅샷 방식의 세션당 추가 메모리가 세션 수에 비례해 늘지 않는지 검사
+    - 세션당 메모리 = (최대 세션 수 - 최소 세션 수) 구간의 추가 메모리 증가분 / 세션 수 차이
+    - 세션당 메모리가 스냅샷 크기 × max_fraction 이하이면 통과 (세션마다 복사본이 생기면 스냅샷 크기 수준)
+    반환: (통과 여부, 방식별 측정 표 + 세션당 메모리 컬럼)
+    """
+    result = simulate_sessions(n_sessions, n_rows=n_rows, seed=seed)
+    snapshot_mb = result.attrs["스냅샷 크기(MB)"]
+
+    per_session = {}
+    for name, group in result.groupby("방식", sort=False):
+        group = group.sort_values("세션 수")
+        first, last = group.iloc[0], group.iloc[-1]
+        per_session[name] = (last["추가 메모리(MB)"] - first["추가 메모리(MB)"]) / max(last["세션 수"] - first["세션 수"], 1)
+
+    result["세션당 메모리(MB)"] = result["방식"].map(per_session)
+    result["허용치(MB)"] = snapshot_mb * max_fraction
+    passed = per_session["공유 스냅샷 + 뷰"] <= snapshot_mb * max_fraction
+    return bool(passed), result
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from utils.periods import month_codes, month_labels
+
+# 진행 단계 (도달 순서)
+# - 결제/과외신청서/매칭: 단계 1/2/3 (funnel.STAGE_COLUMNS와 동일한 코드)
+# - 첫수업: 단계 4 이상
+# - 2회차: 첫수업 이후 '첫수업후2회차수업전' 조건(0 < donemonth_raw <= 0.25, cycle_count == 2)에 해당하지 않는 수업
+STAGES = ['결제', '과외신청서', '매칭', '첫수업', '2회차']
+
+
+def stage_levels(df_processed: pd.DataFrame) -> np.ndarray:
+    """수업별 마지막으로 도달한 단계 번호 (0 = 결제 … 4 = 2회차)"""
+    stage = df_processed['단계'].to_numpy(dtype=np.int64)
+    dm = df_processed['donemonth_raw'].to_numpy(dtype=np.float64)
+    cycle = df_processed['cycle_count'].to_numpy(dtype=np.int64)
+
+    before_second = (dm > 0) & (dm <= 0.25) & (cycle == 2)
+    return np.where(
+        stage >= 4,
+        np.where(before_second, 3, 4),
+        np.clip(stage, 1, 3) - 1
+    )
+
+
+def stage_transition_counts(df_processed: pd.DataFrame):
+    """
+    코호트 월 × 마지막 단계 × 이탈여부 집계 배열 (bincount 한 번)
+    반환: (코호트 코드, counts (C, K, 2), 체류일수 합 (C, K))
+    - counts[..., 1] = 해당 단계에서 이탈, counts[..., 0] = 해당 단계에서 진행 중
+    """
+    if '결제월코드' in df_processed.columns:
+        cohort = df_processed['결제월코드'].to_numpy(dtype=np.int64)
+    else:
+        cohort = month_codes(df_processed['결제등록일'])
+
+    valid = cohort >= 0
+    cohort_codes, cohort_idx = np.unique(cohort[valid], return_inverse=True)
+
+    levels = stage_levels(df_processed)[valid]
+    churn = df_processed['이탈여부'].fillna(0).to_numpy(dtype=np.int64)[valid]
+    days = df_processed['duration_days'].fillna(0).to_numpy(dtype=np.float64)[valid]
+
+    n_cohorts, n_stages = len(cohort_codes), len(STAGES)
+    cell = cohort_idx * n_stages + levels
+    counts = np.bincount(cell * 2 + churn, minlength=n_cohorts * n_stages * 2).reshape(n_cohorts, n_stages, 2)
+    stay_days = np.bincount(cell, weights=days, minlength=n_cohorts * n_stages).reshape(n_cohorts, n_stages)
+    return cohort_codes, counts, stay_days
+
+
+def stage_transition_probabilities(counts):
+    """
+    단계 축 Aalen-Johansen (단계 k에서 진행 중인 수업은 k에서 중도절단)
+    - 진입[k] = 마지막 단계가 k 이상인 수업 수
+    - 전이확률[k] = 진입[k+1] / (진입[k] - 진행 중[k]),  이탈확률[k] = 이탈[k] / (진입[k] - 진행 중[k])
+    - 도달확률[k] = Π_{j<k} 전이확률[j]
+    counts: (..., K, 2) 배열 - 코호트 축이 있으면 코호트별로 계산
+    반환: dict(entered, dropped, censored, progress, dropout, reach)
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=-1)
+    entered = np.cumsum(totals[..., ::-1], axis=-1)[..., ::-1]
+    dropped = counts[..., 1]
+    censored = counts[..., 0]
+
+    # 마지막 단계는 흡수 상태 (더 진행할 단계가 없으므로 위험집합에서 제외)
+    at_risk = entered[..., :-1] - censored[..., :-1]
+    progress = np.divide(entered[..., 1:], at_risk, out=np.full_like(at_risk, np.nan), where=at_risk > 0)
+    dropout = np.divide(dropped[..., :-1], at_risk, out=np.full_like(at_risk, np.nan), where=at_risk > 0)
+
+    reach = np.concatenate([np.ones(progress.shape[:-1] + (1,)), np.cumprod(np.nan_to_num(progress, nan=1.0), axis=-1)], axis=-1)
+    return {
+        "entered": entered,
+        "dropped": dropped,
+        "censored": censored,
+        "progress": progress,
+        "dropout": dropout,
+        "reach": reach,
+    }
+
+
+def stage_transition_table(df_processed: pd.DataFrame) -> pd.DataFrame:
+    """
+    코호트 월(+ 전체) × 단계 전이 표
+    - 진입 수 / 이탈 수 / 진행 중 / 다음 단계 전이확률 / 단계 도달확률 / 평균 체류일수
+    - 평균 체류일수: 마지막 단계가 k인 수업의 duration_days 평균 (단계별 진입 시각이 시트에 없으므로 근사)
+    """
+    cohort_codes, counts, stay_days = stage_transition_counts(df_processed)
+
+    labels = [*month_labels(cohort_codes), "전체"]
+    counts = np.concatenate([counts, counts.sum(axis=0, keepdims=True)])
+    stay_days = np.concatenate([stay_days, stay_days.sum(axis=0, keepdims=True)])
+    probs = stage_transition_probabilities(counts)
+
+    n_cohorts, n_stages = counts.shape[:2]
+    last_counts = counts.sum(axis=-1)
+    pad = np.full((n_cohorts, 1), np.nan)
+
+    return pd.DataFrame({
+        '연-월': np.repeat(labels, n_stages),
+        '단계': np.tile(STAGES, n_cohorts),
+        '진입 수': probs["entered"].ravel().astype(np.int64),
+        '이탈 수': probs["dropped"].ravel().astype(np.int64),
+        '진행 중': probs["censored"].ravel().astype(np.int64),
+        '전이확률': np.hstack([probs["progress"], pad]).ravel(),
+        '이탈확률': np.hstack([probs["dropout"], pad]).ravel(),
+        '도달확률': probs["reach"].ravel(),
+        '평균 체류일수': np.divide(stay_days, last_counts, out=np.full_like(stay_days, np.nan), where=last_counts > 0).ravel(),
+    })
@@ -0,0 +1,173 @@
+import numpy as np
+from scipy.integrate import simpson
+
+from utils.kernels import product_limit
+
+
+def kaplan_meier(durations, events, presorted=False):
+    """
+    NumPy 기반 Kaplan-Meier 추정 (lifelines survival_function_과 동일한 timeline/생존확률)
+    - durations: 생존기간 배열
+    - events: 이탈여부 배열 (1=이탈, 0=중도절단)
+    - presorted: durations가 이미 오름차순 정렬되어 있으면 True (정렬 생략)
+    - 계산은 utils.kernels.product_limit (numba 설치 시 JIT, 없으면 NumPy)
+    """
+    times, survival = product_limit(durations, events, presorted=presorted)
+
+    if len(times) == 0:
+        return np.array([0.0]), np.array([1.0])
+
+    # lifelines와 동일하게 0 시점(생존확률 1)을 앞에 추가
+    if times[0] > 0:
+        times = np.concatenate(([0.0], times))
+        survival = np.concatenate(([1.0], survival))
+
+    return times, survival
+
+
+def kaplan_meier_from_counts(times, deaths, totals):
+    """
+    시점별 집계표(이탈 수, 전체 수)에서 Kaplan-Meier 추정
+    - times: 오름차순 고유 시점
+    - deaths: 시점별 이탈 수
+    - totals: 시점별 관측치 수 (이탈 + 중도절단)
+    """
+    times = np.asarray(times, dtype=np.float64)
+    deaths = np.asarray(deaths, dtype=np.float64)
+    totals = np.asarray(totals, dtype=np.float64)
+
+    if len(times) == 0:
+        return np.array([0.0]), np.array([1.0])
+
+    # 위험집합: 해당 시점 이후(포함) 관측치 수 = 역방향 누적합
+    at_risk = np.cumsum(totals[::-1])[::-1]
+    survival = np.cumprod(1.0 - deaths / at_risk)
+
+    # lifelines와 동일하게 0 시점(생존확률 1)을 앞에 추가
+    if times[0] > 0:
+        times = np.concatenate(([0.0], times))
+        survival = np.concatenate(([1.0], survival))
+
+    return times, survival
+
+
+def survival_at(timeline, survival, t):
+    """특정 시점의 생존확률 (kmf.predict와 동일한 계단함수 조회)"""
+    idx = np.searchsorted(timeline, t, side="right") - 1
+    idx = np.clip(idx, 0, len(timeline) - 1)
+    return survival[idx]
+
+
+def median_survival(timeline, survival):
+    """중위 생존기간 (생존확률이 처음 0.5 이하가 되는 시점, 도달하지 않으면 inf)"""
+    below = np.flatnonzero(survival <= 0.5)
+    return timeline[below[0]] if len(below) else np.inf
+
+
+def km_auc(timeline, survival, max_time):
+    """AUC 계산 (calculate_auc와 동일하게 0 ~ max_time 구간 Simpson 적분)"""
+    mask = (timeline <= max_time) & (timeline >= 0)
+    if mask.sum() < 2:
+        return 0.0
+    return simpson(survival[mask], x=timeline[mask])
+
+
+# 표시 단위별 1단위의 일수 (생존곡선은 항상 일 단위로 저장하고 표시할 때만 나눔)
+UNIT_DAYS = {"일": 1.0, "주": 7.0, "개월": 30.44}
+
+# AUC / 생존율 기준 시점 (36개월)
+HORIZON_DAYS = 36 * UNIT_DAYS["개월"]
+
+# 결제개월수 그룹 [(그룹명, 결제개월수 값)], 값이 None이면 전체
+PAY_MONTH_GROUPS = [
+    ("전체", None),
+    ("1개월 구매", "1"),
+    ("3개월 구매", "3"),
+    ("6개월 구매", "6"),
+    ("12개월 구매", "12")
+]
+
+
+class SurvivalCurve:
+    """
+    일 단위 KM 곡선 + 단위 변환 뷰
+    - 피팅은 duration_days로 한 번만 수행
+    - 주/개월 전환은 시간축에 배율만 적용하므로 재피팅 없음
+    - AUC는 일 단위로 한 번 적분한 값을 단위 일수로 나눠 단위 간 값이 일치
+    """
+
+    def __init__(self, timeline_days, survival):
+        self.timeline_days = timeline_days
+        self.survival = survival
+        self._auc_days = {}
+
+    @classmethod
+    def fit(cls, duration_days, events):
+        return cls(*kaplan_meier(duration_days, events))
+
+    def timeline(self, unit="일"):
+        """표시 단위 시간축"""
+        return self.timeline_days / UNIT_DAYS[unit]
+
+    def auc(self, unit="일", horizon_days=HORIZON_DAYS):
+        """0 ~ horizon_days 구간 AUC (표시 단위)"""
+        if horizon_days not in self._auc_days:
+            self._auc_days[horizon_days] = km_auc(self.timeline_days, self.survival, horizon_days)
+        return self._auc_days[horizon_days] / UNIT_DAYS[unit]
+
+    def survival_at(self, days=HORIZON_DAYS):
+        """특정 시점(일)의 생존확률"""
+        return float(survival_at(self.timeline_days, self.survival, days))
+
+    def median(self, unit="일"):
+        """중위 생존기간 (표시 단위, 도달하지 않으면 inf)"""
+        return median_survival(self.timeline_days, self.survival) / UNIT_DAYS[unit]
+
+
+def fit_group_curves(df_processed, groups, group_col="결제개월수",
+                     duration_col="duration_days", event_col="이탈여부"):
+    """
+    그룹별 일 단위 생존곡선 (단위 전환 시 재사용)
+    - groups: [(그룹명, 그룹값)] 목록, 그룹값이 None이면 전체
+    """
+    curves = {}
+    for group_name, value in groups:
+        data = df_processed if value is None else df_processed[df_processed[group_col] == value]
+        if len(data) > 0:
+            curves[group_name] = SurvivalCurve.fit(data[duration_col], data[event_col])
+    return curves
+
+
+def km_auc_trapezoid_batch(durations, events, max_time):
+    """
+    여러 시나리오의 KM AUC를 한 번에 계산 (perform_kaplan_meier_analysis와 동일한 사다리꼴 적분)
+    - durations, events: (시나리오 수, 관측치 수) 배열
+    - 동일 시점에서는 이탈을 중도절단보다 먼저 처리하면 관측치별 (1 - e/(n-i)) 누적곱이 KM과 같음
+    - 동일 시점 묶음의 마지막 생존확률을 그 시점의 값으로 사용
+    """
+    durations = np.atleast_2d(np.asarray(durations, dtype=np.float64))
+    events = np.broadcast_to(np.atleast_2d(np.asarray(events, dtype=np.float64)), durations.shape)
+    n_obs = durations.shape[1]
+
+    order = np.lexsort((-events, durations), axis=-1)
+    x = np.take_along_axis(durations, order, axis=1)
+    e = np.take_along_axis(events, order, axis=1)
+
+    at_risk = n_obs - np.arange(n_obs)
+    survival_seq = np.cumprod(1.0 - e / at_risk, axis=1)
+
+    # 각 위치가 속한 동일 시점 묶음의 마지막 위치
+    is_end = np.ones_like(x, dtype=bool)
+    is_end[:, :-1] = x[:, 1:] != x[:, :-1]
+    end_idx = np.where(is_end, np.arange(n_obs), n_obs)
+    end_idx = np.minimum.accumulate(end_idx[:, ::-1], axis=1)[:, ::-1]
+    y = np.take_along_axis(survival_seq, end_idx, axis=1)
+
+    # lifelines처럼 최소 시점이 0보다 크면 (0, 1) 시작점 추가, 아니면 무효 시작점
+    x0 = np.where(x[:, :1] > 0, 0.0, -1.0)
+    x = np.concatenate([x0, x], axis=1)
+    y = np.concatenate([np.ones_like(x0), y], axis=1)
+
+    valid = (x[:, :-1] >= 0) & (x[:, 1:] <= max_time)
+    segments = (x[:, 1:] - x[:, :-1]) * (y[:, 1:] + y[:, :-1]) / 2
+    return np.where(valid, segments, 0.0).sum(axis=1)
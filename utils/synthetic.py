@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from utils.periods import month_codes, week_codes
+
+
+def make_processed_sheet(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    processing_google_sheet 결과와 같은 스키마의 합성 데이터 생성 (벤치마크용)
+    - 결제개월수별로 다른 이탈 속도를 갖는 지수분포 생존기간
+    - duration_days는 7일 단위 버킷
+    """
+    rng = np.random.default_rng(seed)
+
+    pay_months = rng.choice(["1", "3", "6", "12"], size=n_rows, p=[0.33, 0.6, 0.06, 0.01])
+    mean_days = pd.Series(pay_months).map({"1": 150, "3": 250, "6": 400, "12": 600}).to_numpy()
+
+    duration_days = (rng.exponential(mean_days) // 7 * 7).astype(int)
+    churn = (rng.random(n_rows) < 0.8).astype(int)
+
+    regdate = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730, size=n_rows), unit="D")
+    stage = np.where(churn == 1, rng.integers(1, 10, size=n_rows), 9)
+    donemonth = duration_days / 28
+
+    return pd.DataFrame({
+        "결제등록일": regdate,
+        "lvt": np.arange(n_rows),
+        "user_No": rng.integers(0, max(n_rows // 3, 1), size=n_rows),
+        "단계": stage,
+        "이탈여부": churn,
+        "donemonth_raw": donemonth,
+        "donemonth": donemonth,
+        "duration_days": duration_days,
+        "학년": rng.choice(["N수생", "고3", "고2", "고1", "중3", "중2", "기타"], size=n_rows),
+        "교과/탐구": rng.choice(["교과", "탐구"], size=n_rows, p=[0.85, 0.15]),
+        "결제개월수": pay_months,
+        "stage_count": rng.integers(0, 20, size=n_rows),
+        "cycle_count": rng.integers(0, 20, size=n_rows),
+        "결제월코드": month_codes(pd.Series(regdate)),
+        "결제주코드": week_codes(pd.Series(regdate)),
+    })
+
+
+def make_source_frame(n_rows: int, seed: int = 0, start="2022-01-01", days=1000) -> pd.DataFrame:
+    """
+    load_data 결과(AUC기본소스 CSV)와 같은 스키마의 합성 데이터 생성
+    - tutoring_state: 완료 상태 / ACTIVE 혼합
+    - 일부 ACTIVE 수업은 마지막 수업일이 오래되어 암묵적 이탈 대상
+    """
+    rng = np.random.default_rng(seed)
+
+    crda = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, size=n_rows), unit="D")
+    fst_months = rng.choice([1.0, 3.0, 6.0, 12.0], size=n_rows, p=[0.33, 0.6, 0.06, 0.01])
+    done_month = np.round(rng.exponential(fst_months * 2 + 3) * 8) / 8
+
+    state = rng.choice(
+        ["ACTIVE", "FINISH", "AUTO_FINISH", "DONE", "NOCARD", "NOPAY", "MATCHED"],
+        size=n_rows, p=[0.25, 0.35, 0.2, 0.1, 0.04, 0.04, 0.02]
+    )
+    lst_tutoring = crda + pd.to_timedelta(done_month * 28 * rng.uniform(0.5, 1.2, size=n_rows), unit="D")
+    lst_tutoring = lst_tutoring.where(rng.random(n_rows) > 0.05)
+
+    return pd.DataFrame({
+        "crda": crda,
+        "lecture_vt_No": rng.integers(1, n_rows * 2, size=n_rows),
+        "student_user_No": rng.integers(1, max(n_rows // 2, 2), size=n_rows),
+        "p_rn": rng.choice([1, 2, 3], size=n_rows, p=[0.946, 0.02, 0.034]),
+        "tutoring_state": state,
+        "done_month": np.where(rng.random(n_rows) > 0.01, done_month, np.nan),
+        "fst_months": fst_months,
+        "fst_pay_date": crda,
+        "reactive_datetime": pd.NaT,
+        "lst_done_at": lst_tutoring,
+        "lst_tutoring_datetime": lst_tutoring,
+        "grade": rng.choice(["N수생", "고3", "고2", "고1", "중3", "기타"], size=n_rows),
+    })
+
+
+def make_raw_sheet(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    fetch_google_sheets_data 결과(이탈_RAW 시트)와 같은 스키마의 합성 데이터 생성
+    - 모든 값은 문자열, 빈 값은 '' (gspread get_all_values와 동일)
+    - 약 0.5%는 테스트 데이터('T')
+    """
+    rng = np.random.default_rng([seed, 1])  # make_processed_sheet와 다른 난수열
+    df = make_processed_sheet(n_rows, seed=seed)
+
+    churn = np.where(df['이탈여부'] == 1, "P", "A")
+    churn = np.where(rng.random(n_rows) < 0.005, "T", churn)
+    option = rng.choice(["W1 주1회", "W2 주2회", "W3 주3회", ""], size=n_rows, p=[0.5, 0.3, 0.1, 0.1])
+
+    return pd.DataFrame({
+        "payment_regdate": df['결제등록일'].dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "lvt": df['lvt'].astype(str),
+        "user_No": df['user_No'].astype(str),
+        "option": option,
+        "단계": df['단계'].astype(str),
+        "이탈여부": churn,
+        "done_month": df['donemonth'].round(4).astype(str),
+        "stage_count": df['stage_count'].astype(str),
+        "cycle_count": df['cycle_count'].astype(str),
+        "최초 개월 수": df['결제개월수'],
+        "학년": df['학년'],
+        "교과/탐구": df['교과/탐구'],
+        "과외상태": np.where(churn == "P", "중단", "진행"),
+        "수업상태": np.where(churn == "P", "FINISH", "ACTIVE"),
+        "중단예정일": "",
+        "중단 예정 DONEMONTH": "",
+    })
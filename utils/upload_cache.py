@@ -0,0 +1,108 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.data_processing import load_data, reference_dates
+
+# 업로드 파일 캐시 위치 / 크기 제한
+DEFAULT_CACHE_DIR = os.path.join(".cache", "uploads")
+MEMORY_CACHE_SIZE = 4
+DISK_CACHE_SIZE = 8
+
+# load_data 결과 스키마가 바뀌면 올려서 이전 디스크 캐시를 무효화
+CACHE_VERSION = 2
+
+# 메모리 LRU는 세션 스레드가 함께 쓰므로 조회·갱신은 _MEMORY_CACHE_LOCK 안에서만
+_MEMORY_CACHE = OrderedDict()
+_MEMORY_CACHE_LOCK = threading.Lock()
+
+
+def content_key(data: bytes) -> str:
+    """업로드 파일 내용 기반 캐시 키 (파일명/업로드 시각과 무관)"""
+    return f"v{CACHE_VERSION}-{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+
+
+def _disk_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.parquet")
+
+
+def _read_disk(cache_dir, key):
+    path = _disk_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception as e:
+        print(f"업로드 캐시 읽기 실패 ({key}): {str(e)}")
+        return None
+    # 최근 사용 순서 갱신 (용량 초과 시 오래된 파일부터 삭제)
+    os.utime(path)
+    return df
+
+
+def _write_disk(cache_dir, key, df, max_entries):
+    """파싱 결과를 Parquet으로 저장 후 max_entries 초과분 정리 (최근 사용이 오래된 순)"""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # 같은 파일을 동시에 저장하는 세션끼리 임시 파일이 겹치지 않도록 스레드별 이름
+        tmp_path = f"{_disk_path(cache_dir, key)}.{os.getpid()}-{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, _disk_path(cache_dir, key))
+
+        entries = sorted(
+            (os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".parquet")),
+            key=os.path.getmtime
+        )
+        for path in entries[:-max_entries]:
+            os.remove(path)
+    except Exception as e:
+        print(f"업로드 캐시 저장 실패 ({key}): {str(e)}")
+
+
+def _recall(key):
+    with _MEMORY_CACHE_LOCK:
+        df = _MEMORY_CACHE.get(key)
+        if df is not None:
+            _MEMORY_CACHE.move_to_end(key)
+        return df
+
+
+def _remember(key, df):
+    with _MEMORY_CACHE_LOCK:
+        _MEMORY_CACHE[key] = df
+        _MEMORY_CACHE.move_to_end(key)
+        while len(_MEMORY_CACHE) > MEMORY_CACHE_SIZE:
+            _MEMORY_CACHE.popitem(last=False)
+
+
+def load_data_cached(uploaded_file, cache_dir=DEFAULT_CACHE_DIR, max_disk_entries=DISK_CACHE_SIZE):
+    """
+    load_data의 내용 주소 기반 캐시 버전
+    1. 업로드 바이트를 해시해 캐시 키 생성
+    2. 메모리 LRU → 디스크 Parquet 순으로 조회, 둘 다 없을 때만 CSV 파싱 + 날짜 변환
+    - 반환 DataFrame은 캐시와 공유되므로 호출하는 쪽에서 수정하지 않음
+      (process_data는 기간 필터 후 복사본으로 작업)
+    반환: (df, CURRNET_DATE, CUTOFF_DATE, 캐시 출처: 'memory' / 'disk' / None)
+    """
+    data = uploaded_file.getvalue()
+    key = content_key(data)
+
+    source = None
+    df = _recall(key)
+    if df is not None:
+        source = 'memory'
+    else:
+        df = _read_disk(cache_dir, key)
+        if df is not None:
+            source = 'disk'
+        else:
+            df, _, _ = load_data(io.BytesIO(data))
+            _write_disk(cache_dir, key, df, max_disk_entries)
+        _remember(key, df)
+
+    CURRNET_DATE, CUTOFF_DATE = reference_dates(df)
+    return df, CURRNET_DATE, CUTOFF_DATE, source
@@ -2,23 +2,33 @@ import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import numpy as np
-from lifelines import KaplanMeierFitter
 from scipy.integrate import simpson
 
+from utils.extrapolation import MODELS, predict_survival
+from utils.periods import month_codes, week_codes, month_starts, week_labels, period_counts
+from utils.survival import PAY_MONTH_GROUPS, UNIT_DAYS, SurvivalCurve, fit_group_curves
+
+def _period_codes(df_processed, code_col, make_codes):
+    """적재 시 계산된 기간 코드 컬럼 사용 (없으면 결제등록일로 계산)"""
+    if code_col in df_processed.columns:
+        return df_processed[code_col].to_numpy(dtype=np.int64)
+    return make_codes(df_processed['결제등록일'])
+
+
 def create_monthly_bar_chart(df_processed):
-    """월별 신규 수업 시작 수 차트 생성"""
-    df_monthly = (
-        df_processed
-        .groupby(pd.Grouper(key="결제등록일", freq="M"))
-        .size()
-        .reset_index(name="수업 수")
+    """월별 신규 수업 시작 수 차트 생성 (연-월 코드 bincount)"""
+    df_monthly = period_counts(
+        _period_codes(df_processed, '결제월코드', month_codes),
+        df_processed['이탈여부']
     )
+    df_monthly['결제등록일'] = month_starts(df_monthly['코드'].to_numpy())
 
     fig_month = px.bar(
         df_monthly,
         x="결제등록일",
         y="수업 수",
         text="수업 수",
+        hover_data=["이탈 수"],
         title="월별 신규 수업 시작 수"
     )
 
@@ -38,56 +48,35 @@ def create_monthly_bar_chart(df_processed):
 
 
 def create_weekly_bar_chart(df_processed):
-    """주별 신규 수업 시작 수 차트 생성"""
-    df_temp = df_processed.copy()
-    df_temp['연도'] = df_temp['결제등록일'].dt.isocalendar().year
-    df_temp['주차'] = df_temp['결제등록일'].dt.isocalendar().week
-    df_temp['연주차코드'] = df_temp['연도'] * 100 + df_temp['주차']
-
-    df_weekly = (
-        df_temp
-        .groupby(['연도','주차','연주차코드'])
-        .size()
-        .reset_index(name="수업 수")
+    """주별 신규 수업 시작 수 차트 생성 (ISO 연-주차 코드 bincount, 라벨은 주 단위로만 생성)"""
+    df_weekly = period_counts(
+        _period_codes(df_processed, '결제주코드', week_codes),
+        df_processed['이탈여부']
     )
-
-    df_weekly['연도-주차'] = df_weekly['연도'].astype(str) + "-W" + df_weekly['주차'].astype(str)
+    df_weekly['연도-주차'] = week_labels(df_weekly['코드'].to_numpy())
 
     fig_week = px.bar(
         df_weekly,
         x="연도-주차",
         y="수업 수",
         text="수업 수",
+        hover_data=["이탈 수"],
         title="주별 신규 수업 시작 수",
-        category_orders={"연도-주차": df_weekly.sort_values("연주차코드")["연도-주차"].tolist()}
+        category_orders={"연도-주차": df_weekly["연도-주차"].tolist()}
     )
 
     return fig_week
 
 
-def create_survival_curve(df_processed, unit="주"):
-    """Kaplan-Meier 생존 곡선 생성"""
-    df_km = pd.DataFrame({
-        "duration": df_processed['duration_days'],
-        "event": df_processed['이탈여부']
-    })
+def create_survival_curve(df_processed, unit="주", curve=None):
+    """Kaplan-Meier 생존 곡선 생성 (curve를 넘기면 재피팅 없이 단위만 변환)"""
+    if curve is None:
+        curve = SurvivalCurve.fit(df_processed['duration_days'], df_processed['이탈여부'])
 
-    kmf = KaplanMeierFitter()
-    kmf.fit(durations=df_km['duration'], event_observed=df_km['event'], label="KM Estimate")
-
-    timeline = kmf.survival_function_.index
-    survival = kmf.survival_function_["KM Estimate"]
-
-    # 단위 변환
-    if unit == "주":
-        x = timeline / 7
-        xlabel = "주"
-    elif unit == "개월":
-        x = timeline / 30
-        xlabel = "개월"
-    else:
-        x = timeline
-        xlabel = "일"
+    # 단위 변환 (일 단위 곡선에 배율 적용)
+    x = curve.timeline(unit)
+    survival = curve.survival
+    xlabel = unit
 
     fig = go.Figure()
 
@@ -122,42 +111,22 @@ def create_survival_curve(df_processed, unit="주"):
     return fig
 
 
-def create_grouped_survival_curves(df_processed, unit="개월"):
-    """결제개월수별 Kaplan-Meier 생존 곡선 생성"""
-    groups = [
-        ("전체", None),
-        ("1개월 구매", "1"),
-        ("3개월 구매", "3"),
-        ("6개월 구매", "6"),
-        ("12개월 구매", "12")
-    ]
-
-    fig = go.Figure()
-    kmf = KaplanMeierFitter()
-
-    for group_name, pay_month in groups:
-        if pay_month is None:
-            data = df_processed
-        else:
-            data = df_processed[df_processed['결제개월수'] == pay_month]
-
-        if len(data) > 0:
-            # 단위에 따른 duration 계산
-            if unit == "주":
-                durations = data['duration_days'] / 7
-            else:  # 개월
-                durations = data['duration_days'] / 30.44
+def create_grouped_survival_curves(df_processed, unit="개월", curves=None):
+    """결제개월수별 Kaplan-Meier 생존 곡선 생성 (curves를 넘기면 재피팅 없이 단위만 변환)"""
+    groups = PAY_MONTH_GROUPS
 
-            events = data["이탈여부"].astype(int)
+    if curves is None:
+        curves = fit_group_curves(df_processed, groups)
 
-            kmf.fit(durations, event_observed=events, label=group_name)
+    fig = go.Figure()
 
-            survival = kmf.survival_function_[group_name]
-            timeline = kmf.survival_function_.index
+    for group_name, _ in groups:
+        if group_name in curves:
+            curve = curves[group_name]
 
             fig.add_trace(go.Scatter(
-                x=timeline,
-                y=survival,
+                x=curve.timeline(unit),
+                y=curve.survival,
                 mode='lines',
                 line_shape='hv',
                 name=group_name
@@ -182,14 +151,52 @@ def create_grouped_survival_curves(df_processed, unit="개월"):
     return fig
 
 
+def create_approximate_survival_curves(approx, unit="개월"):
+    """층화 표본 근사 KM 곡선 + 95% 오차 범위 (정확한 결과 계산 전 미리보기)"""
+    colors = px.colors.qualitative.Plotly
+    fig = go.Figure()
+
+    for i, (group_name, curve) in enumerate(approx["curves"].items()):
+        color = colors[i % len(colors)]
+        lower, upper = approx["bands"][group_name]
+        x = curve.timeline(unit)
+
+        fig.add_trace(go.Scatter(
+            x=x, y=lower, mode='lines', line_shape='hv', line=dict(width=0),
+            legendgroup=group_name, showlegend=False, hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=x, y=upper, mode='lines', line_shape='hv', line=dict(width=0),
+            fill='tonexty', fillcolor="rgba({}, {}, {}, 0.2)".format(*px.colors.hex_to_rgb(color)),
+            legendgroup=group_name, showlegend=False, hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=x, y=curve.survival, mode='lines', line_shape='hv',
+            line=dict(color=color), legendgroup=group_name, name=group_name
+        ))
+
+    fig.update_layout(
+        title=f"Kaplan–Meier 생존 곡선 (근사: 표본 {approx['sample_size']:,}건, 음영 = 95% 오차 범위)",
+        xaxis_title=unit,
+        yaxis_title="생존 확률",
+        template="plotly_white",
+        hovermode="x unified",
+        legend=dict(
+            x=0.98, y=0.98,
+            xanchor="right", yanchor="top",
+            bgcolor="rgba(255,255,255,0.6)",
+            bordercolor="LightGray", borderwidth=1
+        )
+    )
+    fig.update_yaxes(tick0=0.0, dtick=0.1, range=[0,1], showgrid=False)
+    fig.update_xaxes(showgrid=False)
+
+    return fig
+
+
 def create_survival_duration_boxplot(df_processed, unit="개월"):
     """결제개월수별 생존 기간 박스 플롯 생성"""
-    groups = [
-        ("1개월 구매", "1"),
-        ("3개월 구매", "3"),
-        ("6개월 구매", "6"),
-        ("12개월 구매", "12")
-    ]
+    groups = [(name, value) for name, value in PAY_MONTH_GROUPS if value is not None]
 
     fig = go.Figure()
 
@@ -198,10 +205,7 @@ def create_survival_duration_boxplot(df_processed, unit="개월"):
 
         if len(data) > 0:
             # 단위에 따른 duration 계산
-            if unit == "주":
-                durations = data['duration_days'] / 7
-            else:  # 개월
-                durations = data['duration_days'] / 30.44
+            durations = data['duration_days'] / UNIT_DAYS[unit]
 
             fig.add_trace(go.Box(
                 y=durations,
@@ -328,4 +332,170 @@ def display_auc_improvement_results(auc_current, auc_improved):
         improvement = auc_improved - auc_current
         improvement_pct = (improvement / auc_current) * 100
         st.markdown("**개선 효과**")
-        st.markdown(f"<span style='font-size:20px; font-weight:bold; color:blue;'>+{improvement:.2f}개월 ({improvement_pct:+.1f}%)</span>", unsafe_allow_html=True)
\ No newline at end of file
+        st.markdown(f"<span style='font-size:20px; font-weight:bold; color:blue;'>+{improvement:.2f}개월 ({improvement_pct:+.1f}%)</span>", unsafe_allow_html=True)
+
+def create_extrapolation_chart(df_processed, fit, unit="개월", horizon_days=60 * UNIT_DAYS["개월"], curves=None):
+    """
+    관측 KM 곡선과 모수모형 외삽 곡선 비교 그래프
+    - curves: {"N개월 구매": SurvivalCurve} (넘기면 관측 곡선은 재피팅 없이 단위만 변환)
+    """
+    unit_days = UNIT_DAYS[unit]
+    grid = np.linspace(0, horizon_days, 400)
+    fitted = predict_survival(fit, grid)
+    colors = px.colors.qualitative.Set1
+
+    if curves is None:
+        curves = fit_group_curves(df_processed, [(f"{label}개월 구매", label) for label in fit["labels"]])
+
+    fig = go.Figure()
+
+    for i, label in enumerate(fit["labels"]):
+        curve = curves.get(f"{label}개월 구매")
+        color = colors[i % len(colors)]
+
+        if curve is not None:
+            fig.add_trace(go.Scatter(
+                x=curve.timeline(unit),
+                y=curve.survival,
+                mode='lines',
+                line_shape='hv',
+                line=dict(color=color),
+                name=f"{label}개월 구매 (관측)"
+            ))
+
+        # 관측치가 없는 그룹은 외삽 모수가 NaN이므로 곡선 생략
+        if np.isnan(fitted[i]).all():
+            continue
+        fig.add_trace(go.Scatter(
+            x=grid / unit_days,
+            y=fitted[i],
+            mode='lines',
+            line=dict(color=color, dash='dash'),
+            name=f"{label}개월 구매 ({MODELS[fit['model']]})"
+        ))
+
+    fig.update_layout(
+        title=f"관측 생존곡선 vs 외삽 ({MODELS[fit['model']]})",
+        xaxis_title=unit,
+        yaxis_title="생존 확률",
+        template="plotly_white",
+        hovermode="x unified"
+    )
+    fig.update_yaxes(tick0=0.0, dtick=0.1, range=[0, 1], showgrid=False)
+    fig.update_xaxes(showgrid=False)
+
+    return fig
+
+
+def create_churn_funnel_chart(funnel_df):
+    """월별 퍼널 단계 이탈률 추이 그래프 생성"""
+    stage_cols = ['결제직후매칭전', '매칭직후첫수업전', '첫수업후2회차수업전', '2회차수업후DM1이하']
+
+    fig = go.Figure()
+    for col in stage_cols:
+        fig.add_trace(go.Bar(
+            x=funnel_df['연-월'],
+            y=funnel_df[col],
+            name=col
+        ))
+
+    fig.update_layout(
+        title="월별 퍼널 단계 이탈률 (누적)",
+        barmode="stack",
+        xaxis_title="연-월",
+        yaxis_title="이탈률(%)",
+        template="plotly_white",
+        hovermode="x unified"
+    )
+
+    return fig
+
+
+def create_stage_sankey(stage_table, cohort="전체"):
+    """단계 전이 Sankey (다음 단계 진행 / 단계별 이탈 / 진행 중)"""
+    rows = stage_table[stage_table['연-월'] == cohort].reset_index(drop=True)
+    stages = rows['단계'].tolist()
+
+    labels = list(stages)
+    sources, targets, values, colors = [], [], [], []
+
+    def add_node(label):
+        labels.append(label)
+        return len(labels) - 1
+
+    for k, row in rows.iterrows():
+        if k + 1 < len(rows):
+            sources.append(k)
+            targets.append(k + 1)
+            values.append(rows.loc[k + 1, '진입 수'])
+            colors.append("rgba(31, 119, 180, 0.4)")
+        for column, suffix, color in [('이탈 수', '이탈', "rgba(214, 39, 40, 0.4)"),
+                                      ('진행 중', '진행 중', "rgba(127, 127, 127, 0.3)")]:
+            if row[column] > 0:
+                sources.append(k)
+                after = "이후 " if k + 1 == len(rows) else ""
+                targets.append(add_node(f"{row['단계']} {after}{suffix}"))
+                values.append(row[column])
+                colors.append(color)
+
+    fig = go.Figure(go.Sankey(
+        arrangement="snap",
+        node=dict(label=labels, pad=15, thickness=15),
+        link=dict(source=sources, target=targets, value=values, color=colors)
+    ))
+    fig.update_layout(title=f"단계 전이 흐름 ({cohort})", template="plotly_white", height=450)
+
+    return fig
+
+
+def create_customer_survival_chart(lesson_curve, customer_curve, unit="개월"):
+    """수업 단위 vs 고객 단위(마지막 수업 종료 시 이탈) KM 생존 곡선 비교"""
+    fig = go.Figure()
+
+    for name, curve, color in [("수업 단위", lesson_curve, "gray"), ("고객 단위", customer_curve, "blue")]:
+        fig.add_trace(go.Scatter(
+            x=curve.timeline(unit),
+            y=curve.survival,
+            mode='lines',
+            line_shape='hv',
+            line=dict(color=color, width=2),
+            name=name
+        ))
+
+    fig.update_layout(
+        title="Kaplan–Meier 생존 곡선 (수업 vs 고객)",
+        xaxis_title=unit,
+        yaxis_title="생존 확률",
+        template="plotly_white",
+        hovermode="x unified"
+    )
+    fig.update_yaxes(tick0=0.0, dtick=0.1, range=[0, 1], showgrid=False)
+    fig.update_xaxes(showgrid=False)
+
+    return fig
+
+
+def create_repurchase_chart(gap_curves, unit="주"):
+    """구매 순번별 누적 재구매 확률 (1 - KM 곡선)"""
+    fig = go.Figure()
+
+    for name, curve in gap_curves.items():
+        fig.add_trace(go.Scatter(
+            x=curve.timeline(unit),
+            y=1 - curve.survival,
+            mode='lines',
+            line_shape='hv',
+            name=name
+        ))
+
+    fig.update_layout(
+        title="구매 후 경과 시간별 누적 재구매 확률",
+        xaxis_title=unit,
+        yaxis_title="누적 재구매 확률",
+        template="plotly_white",
+        hovermode="x unified"
+    )
+    fig.update_yaxes(tick0=0.0, dtick=0.1, range=[0, 1], showgrid=False)
+    fig.update_xaxes(showgrid=False)
+
+    return fig